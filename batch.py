@@ -0,0 +1,156 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pipeline import run_pipeline
+
+
+def _is_batch_results(path):
+    """True if a JSON file is a results file written by run_batch."""
+    try:
+        with open(path, 'r') as f:
+            content = json.load(f)
+    except (OSError, ValueError):
+        # Not readable as JSON: let the job report the error
+        return False
+    return isinstance(content, dict) and "jobs" in content and "started_at" in content
+
+
+def collect_config_files(paths):
+    """
+    Expand config paths: directories become their *.json files (sorted),
+    leaving out run reports (*.report.json) written next to outputs and
+    batch results files (e.g. batch_results.json from an earlier run).
+    
+    Parameters:
+    paths (list): Config files and/or directories of config files
+    
+    Returns:
+    list: Config file paths, in order
+    """
+    config_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            config_files.extend(
+                config_file for config_file in sorted(glob.glob(os.path.join(path, '*.json')))
+                if not config_file.endswith('.report.json') and not _is_batch_results(config_file)
+            )
+        else:
+            config_files.append(path)
+    return config_files
+
+
+def _warm_imports():
+    """Worker initializer: import the pipeline (pandas, openpyxl) once per process."""
+    import pipeline
+
+
+def run_job(job):
+    """
+    Run one config and return its result as plain data (never raises).
+    
+    Parameters:
+    job (str or dict): Path of a JSON config file, or a config dict
+    
+    Returns:
+    dict: name, status ('passed'/'failed'), wall_s, and either stats,
+    output_file and stage timings, or error_type and error
+    """
+    name = job if isinstance(job, str) else job.get("name", "config")
+    entry = {"name": name, "status": "failed", "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        if isinstance(job, str):
+            with open(job, 'r') as f:
+                job = json.load(f)
+        result = run_pipeline(job)
+        entry.update({
+            "status": "passed",
+            "output_file": result.output_file,
+            "stats": result.stats,
+            "warnings": result.warnings,
+            "stages": {stage["name"]: stage["wall_s"] for stage in result.report.to_dict()["stages"]},
+        })
+    except Exception as e:
+        entry.update({"error_type": type(e).__name__, "error": str(e)})
+    entry["wall_s"] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+def run_batch(jobs, workers=None, results_file=None):
+    """
+    Run many configs, in a pool of warm worker processes.
+    
+    Each job runs through pipeline.run_pipeline, so config.json is never
+    read or written and jobs cannot interfere through it. One failing job
+    does not stop the others.
+    
+    Parameters:
+    jobs (list): Config file paths and/or config dicts
+    workers (int or None): Worker processes (None = one per CPU, 1 = run in this process)
+    results_file (str or None): Write the consolidated results here as JSON
+    
+    Returns:
+    dict: started_at, workers, wall_s, passed, failed and one entry per job (in job order)
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    started_at = datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+    
+    if workers == 1:
+        entries = [run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_imports) as executor:
+            entries = list(executor.map(run_job, jobs))
+    
+    results = {
+        "started_at": started_at,
+        "workers": workers,
+        "wall_s": round(time.perf_counter() - start, 4),
+        "passed": sum(1 for entry in entries if entry["status"] == "passed"),
+        "failed": sum(1 for entry in entries if entry["status"] != "passed"),
+        "jobs": entries,
+    }
+    if results_file:
+        out_dir = os.path.dirname(results_file)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(results_file, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many data cleaner configs in one batch.")
+    parser.add_argument("configs", nargs="+", help="Config files and/or directories of *.json configs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--output", default="batch_results.json", help="Consolidated JSON results file")
+    args = parser.parse_args(argv)
+    
+    config_files = collect_config_files(args.configs)
+    if not config_files:
+        print("❌ ERROR: No config files found")
+        return 1
+    
+    print(f"Running {len(config_files)} job(s)...")
+    results = run_batch(config_files, workers=args.workers, results_file=args.output)
+    for entry in results["jobs"]:
+        if entry["status"] == "passed":
+            print(f"✅ {entry['name']} ({entry['wall_s']:.2f}s, {entry['stats']['final_rows']} rows)")
+        else:
+            print(f"❌ {entry['name']} ({entry['error_type']}: {entry['error']})")
+    print()
+    print(f"📊 {results['passed']} passed, {results['failed']} failed in {results['wall_s']:.2f}s "
+          f"with {results['workers']} worker(s)")
+    print(f"💾 Results saved to {args.output}")
+    return 0 if results["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
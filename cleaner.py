@@ -1,18 +1,41 @@
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
-import re
 from openpyxl import load_workbook
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+from itertools import islice
+from dedup import normalized_key_codes
+from fuzzy import remove_fuzzy_duplicates
+from errors import ColumnMismatchError, MissingColumnError
+from readers import read_file
+from writers import compute_column_widths
 
 
 
-def remove_duplicates(df, subset_columns=None, keep_rule="first"):
+def remove_duplicates(df, subset_columns=None, keep_rule="first", key_normalizers=None, fuzzy=None):
     """
     Remove duplicate rows from the DataFrame on selected columns.
 
+    With key_normalizers (names from dedup.KEY_NORMALIZERS: 'strip',
+    'lower', 'digits'), the distinct key values are normalized with
+    vectorized string operations and turned into one int64 key per row,
+    which is then deduplicated, so ' John@X.com' and 'john@x.com' are
+    duplicates.
+
+    With fuzzy (options for fuzzy.remove_fuzzy_duplicates, e.g.
+    {"max_distance": 1}), keys within that edit distance of each other
+    are duplicates too; this needs exactly one subset column.
+
     Parameters:
     df (pd.DataFrame): Input DataFrame.
     subset_columns (list or None): Columns to consider for identifying duplicates.
     keep_rule (str or False): 'first', 'last', or False.
+    key_normalizers (list or None): Normalize the key text before comparing.
+    fuzzy (dict or None): Also remove near-duplicate keys (typos).
 
     Returns:
     tuple: (cleaned_df, removed_count)
@@ -24,26 +47,91 @@ def remove_duplicates(df, subset_columns=None, keep_rule="first"):
     if subset_columns is not None:
         for col in subset_columns:
             if col not in df.columns:
-                raise ValueError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+                raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
 
     initial_count = len(df)
-    cleaned_df = df.drop_duplicates(subset=subset_columns, keep=keep_rule)
+    if fuzzy is not None:
+        if subset_columns is None or len(subset_columns) != 1:
+            raise ValueError("Fuzzy deduplication needs exactly one subset column")
+        cleaned_df, _ = remove_fuzzy_duplicates(
+            df, subset_columns[0], keep_rule=keep_rule, normalizers=key_normalizers, **fuzzy
+        )
+    elif key_normalizers:
+        keys = normalized_key_codes(df, subset_columns or list(df.columns), key_normalizers)
+        duplicate = pd.Series(keys).duplicated(keep=keep_rule).to_numpy()
+        cleaned_df = df[~duplicate]
+    else:
+        cleaned_df = df.drop_duplicates(subset=subset_columns, keep=keep_rule)
     removed_count = initial_count - len(cleaned_df)
 
     return cleaned_df, removed_count
 
 
-def merge_excel_files(file_paths, sheet_name=0):
+def check_columns(path, columns, first_columns):
+    """Raise ColumnMismatchError if a file's columns differ from the first file's."""
+    if list(columns) != first_columns:
+        raise ColumnMismatchError(
+            f"Column mismatch: {path} has different columns than first file.\n"
+            f"Expected: {first_columns}\n"
+            f"Got: {list(columns)}"
+        )
+
+
+def _read_files_parallel(file_paths, sheet_name, workers, excel_engine="auto", columns=None):
+    """
+    Read files in a process pool, checking columns as each file arrives.
+    
+    Returns:
+    list: DataFrames in the original file order
+    """
+    dfs = [None] * len(file_paths)
+    first_columns = None
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+        futures = {
+            executor.submit(read_file, path, sheet_name, excel_engine, columns): i
+            for i, path in enumerate(file_paths)
+        }
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                dfs[i] = future.result()
+                
+                #Check column consistency (files that arrived before the first one wait for it)
+                if i == 0:
+                    first_columns = list(dfs[0].columns)
+                    for j in range(1, len(dfs)):
+                        if dfs[j] is not None:
+                            check_columns(file_paths[j], dfs[j].columns, first_columns)
+                elif first_columns is not None:
+                    check_columns(file_paths[i], dfs[i].columns, first_columns)
+        except BaseException:
+            # Don't wait for the remaining files once one has failed
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    return dfs
+
+
+def merge_excel_files(file_paths, sheet_name=0, workers=None, excel_engine="auto", columns=None):
     """ Merge multiple Excel or CSV files (or process a single file).
     
     Supports:
     - .xlsx (Excel 2007+)
     - .xls (Excel 97-2003)
-    - .csv (Comma-separated values)
+    - .csv / .csv.gz (Comma-separated values)
+    - .parquet, .feather, .arrow / .ipc (Columnar formats, need pyarrow)
+    
+    With workers > 1, files are parsed concurrently in a process pool and
+    concatenated in their original order, so the result is the same as
+    reading them one after another.
     
     Parameters:
     file_paths (list): List of file paths to merge (can be 1 or more)
     sheet_name (int or str): Sheet name or index to read (Excel only)
+    workers (int or None): Number of processes used to read files
+    excel_engine (str): Excel reader - 'auto', 'calamine' or 'openpyxl'
+    columns (list or None): Only read these columns from each file (None = all)
     
     Returns:
     pd.DataFrame: Merged DataFrame"""
@@ -53,47 +141,33 @@ def merge_excel_files(file_paths, sheet_name=0):
     
     # Handle single file (no merging needed)
     if len(file_paths) == 1:
-        file_path = file_paths[0]
+        return read_file(file_paths[0], sheet_name=sheet_name, engine=excel_engine, columns=columns)
+    
+    if workers is not None and workers > 1:
+        dfs = _read_files_parallel(file_paths, sheet_name, workers, excel_engine, columns)
+    else:
+        # Handle multiple files (original merging logic)
+        dfs = []
+        first_columns = None
         
-        #Check file extension
-        if file_path.lower().endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-        
-        return df
-    
-    
-    # Handle multiple files (original merging logic)
-    dfs = []
-    first_columns = None
+        for i, path in enumerate(file_paths):
+            df = read_file(path, sheet_name=sheet_name, engine=excel_engine, columns=columns)
+            
+            #Check column consistency
+            if i == 0:
+                first_columns = list(df.columns)
+            else:
+                check_columns(path, df.columns, first_columns)
+            
+            dfs.append(df)
     
-    for i, path in enumerate(file_paths):
-        #Read file based on extension
-        if path.lower().endswith('.csv'):
-            df = pd.read_csv(path)
-        else:
-            df = pd.read_excel(path, sheet_name=sheet_name)
-        
-        #Check column consistency
-        
-        if i == 0:
-            first_columns = list(df.columns)
-        else:
-            if list(df.columns) != first_columns:
-                raise ValueError(
-                    f"Column mismatch: {path} has different columns than first file.\n"
-                    f"Expected: {first_columns}\n"
-                    f"Got: {list(df.columns)}"
-                )
-        
-        dfs.append(df)
     #Merge all types of files (Excel and CSV)
     merged_df = pd.concat(dfs, ignore_index=True)
     return merged_df
 
 
-def clean_excel_pipeline(file_paths, subset_columns=None, keep_rule="first", sheet_name=0):
+def clean_excel_pipeline(file_paths, subset_columns=None, keep_rule="first", sheet_name=0, workers=None,
+                         excel_engine="auto", columns=None):
     """
     Complete pipeline to merge Excel files (deduplication handled separately).
 
@@ -102,11 +176,16 @@ def clean_excel_pipeline(file_paths, subset_columns=None, keep_rule="first", she
     subset_columns (list): Columns to consider for duplicate removal (not used, kept for compatibility).
     keep_rule (str/bool): Duplicate removal rule (not used, kept for compatibility).
     sheet_name (str/int): Sheet name or index.
+    workers (int or None): Number of processes used to read files.
+    excel_engine (str): Excel reader engine (see readers.EXCEL_ENGINES).
+    columns (list or None): Only read these columns (projection pushdown).
 
     Returns:
     tuple: (final_df, summary) where summary contains operation metadata.
     """
-    merged_df = merge_excel_files(file_paths, sheet_name=sheet_name)
+    merged_df = merge_excel_files(
+        file_paths, sheet_name=sheet_name, workers=workers, excel_engine=excel_engine, columns=columns
+    )
     
     rows_before = len(merged_df)
     
@@ -124,13 +203,374 @@ def clean_excel_pipeline(file_paths, subset_columns=None, keep_rule="first", she
 
     return final_df, summary
 
-def standardize_dates(df, date_columns):
+
+class ValueCache:
+    """
+    Bounded LRU cache of cleaned values, shared across columns and files.
+    
+    Parameters:
+    max_size (int): Maximum number of cached values
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Return the cached value for key, or ValueCache._MISSING."""
+        value = self.values.get(key, self._MISSING)
+        if value is self._MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return value
+    
+    def put(self, key, value):
+        self.values[key] = value
+        self.values.move_to_end(key)
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+    
+    @property
+    def hit_rate(self):
+        """Share of distinct-value lookups served from the cache (0.0-1.0)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _memoize_column(series, kind, clean_series, cache):
+    """
+    Clean a column by cleaning only its distinct values.
+    
+    The column is factorized, distinct values missing from the cache are
+    cleaned in one call, and results are mapped back through the codes.
+    
+    Parameters:
+    series (pd.Series): Raw column values
+    kind (tuple): Cache namespace, e.g. ("phone",)
+    clean_series (callable): Series -> (cleaned str Series, valid count)
+    cache (ValueCache): Shared cache of cleaned values
+    
+    Returns:
+    tuple: (cleaned Series, number of rows with a non-empty result)
+    """
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object), use_na_sentinel=True)
+    
+    # One extra slot so missing values (code -1) map to ''
+    cleaned = np.empty(len(uniques) + 1, dtype=object)
+    cleaned[-1] = ""
+    
+    missing = []
+    for i, value in enumerate(uniques):
+        result = cache.get(kind + (value,))
+        if result is ValueCache._MISSING:
+            missing.append(i)
+        else:
+            cleaned[i] = result
+    
+    if missing:
+        fresh, _ = clean_series(pd.Series(uniques[missing], dtype=object))
+        fresh = fresh.to_numpy(dtype=object)
+        cleaned[missing] = fresh
+        for i, result in zip(missing, fresh):
+            cache.put(kind + (uniques[i],), result)
+    
+    result = cleaned[codes]
+    return pd.Series(result, index=series.index), int((result != "").sum())
+
+
+# Common date formats, tried in this order
+DATE_FORMATS = [
+    '%m/%d/%Y',      # 01/15/2024
+    '%Y-%m-%d',      # 2024-02-20
+    '%B %d, %Y',     # March 10, 2024
+    '%b %d, %Y',     # Mar 10, 2024
+    '%d/%m/%Y',      # 15/01/2024
+    '%Y/%m/%d',      # 2024/01/15
+]
+
+
+def _auto_parse_date(value):
+    """Parse a single value with pandas auto-detection (NaT on failure)."""
+    try:
+        return pd.to_datetime(value)
+    except:
+        return pd.NaT
+
+
+def _wall_time(value):
+    """datetime64 of a parsed Timestamp, tz-aware ones as their local wall time."""
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_localize(None)
+    return value.to_datetime64()
+
+
+def _parse_date_series(series, preferred_format=None):
+    """
+    Parse a column of mixed-format dates a whole column at a time.
+    
+    Each format in DATE_FORMATS is tried against the rows that are still
+    unparsed, so most rows are handled by a single vectorized call. Rows
+    that match no format fall back to per-cell auto-detection.
+    
+    Parameters:
+    series (pd.Series): Raw date values
+    preferred_format (str or None): Format to try before DATE_FORMATS
+    
+    Returns:
+    pd.Series: datetime64 Series (NaT where parsing failed)
+    """
+    # tz-aware dates keep their local wall time, not the UTC instant
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)
+    values = series.to_numpy(dtype=object)
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    pending = np.flatnonzero(pd.notna(values))
+    
+    # tz-aware datetime objects need no format (object columns, e.g. mixed offsets)
+    if pending.size and pd.api.types.infer_dtype(values[pending], skipna=True) != "string":
+        aware = np.array([getattr(values[i], "tzinfo", None) is not None for i in pending], dtype=bool)
+        for i in pending[aware]:
+            result[i] = _wall_time(values[i])
+        pending = pending[~aware]
+    
+    formats = DATE_FORMATS
+    if preferred_format is not None:
+        formats = [preferred_format] + [fmt for fmt in DATE_FORMATS if fmt != preferred_format]
+    
+    for fmt in formats:
+        if pending.size == 0:
+            break
+        parsed = pd.to_datetime(values[pending], format=fmt, errors='coerce').to_numpy()
+        hit = ~np.isnat(parsed)
+        result[pending[hit]] = parsed[hit]
+        pending = pending[~hit]
+    
+    # If all formats fail, try pandas auto-detection (once per distinct text)
+    parsed_text = {}
+    for i in pending:
+        value = values[i]
+        if isinstance(value, str):
+            if value not in parsed_text:
+                parsed_text[value] = _auto_parse_date(value)
+            parsed = parsed_text[value]
+        else:
+            parsed = _auto_parse_date(value)
+        if pd.notna(parsed):
+            result[i] = _wall_time(parsed)
+    
+    return pd.Series(result, index=series.index)
+
+
+def _sample_dates(series, sample_size):
+    """Return up to sample_size non-null values from a date column."""
+    non_null = series.dropna()
+    if len(non_null) > sample_size:
+        non_null = non_null.sample(n=sample_size, random_state=0)
+    return non_null.to_numpy(dtype=object)
+
+
+def _format_hit_count(values, fmt):
+    """Count how many values parse with a single format."""
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    return int(parsed.notna().sum())
+
+
+def infer_date_format(series, sample_size=1000):
+    """
+    Infer the dominant date format of a column from a sample of its values.
+    
+    Parameters:
+    series (pd.Series): Raw date values
+    sample_size (int): Maximum number of non-null values to inspect
+    
+    Returns:
+    str or None: Format from DATE_FORMATS that parses the most sampled
+    values (earlier formats win ties), or None if none of them match
+    """
+    sample = _sample_dates(series, sample_size)
+    if len(sample) == 0:
+        return None
+    
+    best_format = None
+    best_hits = 0
+    for fmt in DATE_FORMATS:
+        hits = _format_hit_count(sample, fmt)
+        if hits > best_hits:
+            best_format = fmt
+            best_hits = hits
+        if hits == len(sample):
+            break
+    
+    return best_format
+
+
+class DateFormatCache:
+    """
+    Learned date formats keyed by (source file, column).
+    
+    Formats are kept in memory and, when a file path is given, persisted as
+    JSON so later runs on the same feed can skip format inference.
+    
+    Parameters:
+    cache_file (str or None): JSON file to load from and save to
+    """
+    
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self.formats = {}
+        self.dirty = False
+        
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    self.formats = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                # Corrupt cache: start over, it is rebuilt on the next save
+                self.formats = {}
+    
+    @staticmethod
+    def _key(source, column):
+        return f"{source}::{column}"
+    
+    def get(self, source, column):
+        return self.formats.get(self._key(source, column))
+    
+    def set(self, source, column, fmt):
+        key = self._key(source, column)
+        if self.formats.get(key) != fmt:
+            self.formats[key] = fmt
+            self.dirty = True
+    
+    def save(self):
+        """Write the cache to disk if anything changed."""
+        if not self.cache_file or not self.dirty:
+            return
+        
+        cache_dir = os.path.dirname(self.cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump(self.formats, f, indent=2, sort_keys=True)
+        self.dirty = False
+
+
+def _column_date_format(series, col, format_cache, source, sample_size=1000):
+    """
+    Return the learned format for a column, inferring it on a cache miss.
+    
+    source is a list when the column holds several merged files. Each file
+    keeps its own entry, so a run over a different set of files reuses the
+    format learned for the files it shares with earlier runs.
+    """
+    sources = source if isinstance(source, (list, tuple)) else [source]
+    if format_cache is not None:
+        known = {format_cache.get(name, col) for name in sources} - {None}
+        if len(known) == 1:
+            fmt = known.pop()
+            # Re-infer if the feed changed format since the format was learned
+            sample = _sample_dates(series, sample_size)
+            if len(sample) == 0 or _format_hit_count(sample, fmt) * 2 >= len(sample):
+                for name in sources:
+                    format_cache.set(name, col, fmt)
+                return fmt
+    
+    fmt = infer_date_format(series, sample_size=sample_size)
+    if fmt is not None and format_cache is not None:
+        for name in sources:
+            format_cache.set(name, col, fmt)
+    return fmt
+
+
+def _format_date_series(series, preferred_format=None):
+    """
+    Parse a date column and format it as YYYY-MM-DD strings.
+    
+    Parameters:
+    series (pd.Series): Raw date values
+    preferred_format (str or None): Format to try before DATE_FORMATS
+    
+    Returns:
+    tuple: (formatted Series with '' for unparseable values, valid count)
+    """
+    # Apply date parsing (one vectorized pass per format)
+    parsed = _parse_date_series(series, preferred_format=preferred_format).to_numpy()
+    valid = ~np.isnat(parsed)
+    
+    # Format the parsed dates as YYYY-MM-DD straight into the result,
+    # empty string where parsing failed
+    formatted = np.full(len(parsed), "", dtype=object)
+    formatted[valid] = pd.DatetimeIndex(parsed[valid]).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    return pd.Series(formatted, index=series.index), int(valid.sum())
+
+
+def infer_column_date_formats(df, date_columns, format_cache=None, source=None):
+    """
+    Learn the preferred format of each date column (see standardize_dates).
+    
+    Parameters:
+    df (pd.DataFrame): Input DataFrame
+    date_columns (list): Column names containing dates
+    format_cache (DateFormatCache or None): Learned formats to reuse/update
+    source (str, list or None): Source identifier used as the cache key (a list
+    of input files for a merged frame)
+    
+    Returns:
+    dict: Column name -> format (or None when no format matched)
+    """
+    formats = {}
+    for col in date_columns:
+        if col not in df.columns:
+            raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+        formats[col] = _column_date_format(df[col], col, format_cache, source)
+    return formats
+
+
+def _set_column(df, col, values):
+    """
+    Replace a column's values in place.
+    
+    Set by position, so a frame sliced from another one (e.g. by
+    drop_duplicates) takes the new column without a SettingWithCopyWarning.
+    The old column array is replaced, never written into, so frames that
+    share it are not affected.
+    """
+    loc = df.columns.get_loc(col)
+    if isinstance(loc, int):
+        df.isetitem(loc, values)
+    else:
+        df[col] = values
+
+
+def standardize_dates(df, date_columns, infer_formats=False, format_cache=None, source=None,
+                      value_cache=None, column_formats=None, inplace=False):
     """
     Standardize date columns to YYYY-MM-DD format.
     
+    With infer_formats=True, each column is sampled to find its dominant
+    format, which is tried first for every row; rows that fail it go
+    through the full format list. Note that ambiguous values such as
+    01/02/2024 then follow the column's format instead of the default
+    format order.
+    
     Parameters:
     df (pd.DataFrame): Input DataFrame
     date_columns (list): Column names containing dates
+    infer_formats (bool): Infer a dominant format per column
+    format_cache (DateFormatCache or None): Learned formats to reuse/update
+    source (str, list or None): Source identifier used as the cache key (a list
+    of input files for a merged frame)
+    value_cache (ValueCache or None): Clean distinct values only, memoized
+    column_formats (dict or None): Preferred format per column, used
+    instead of inferring one (see infer_column_date_formats)
+    inplace (bool): Replace the date columns in df itself instead of in a
+    copy (for callers that no longer need the original frame)
     
     Returns:
     tuple: (cleaned_df, conversion_count)
@@ -138,56 +578,168 @@ def standardize_dates(df, date_columns):
     if not date_columns:
         raise ValueError("date_columns cannot be empty")
     
-    df_copy = df.copy()
+    # Check every column first, so a failed call leaves df unchanged
+    for col in date_columns:
+        if col not in df.columns:
+            raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+    
+    df_copy = df if inplace else df.copy()
     conversion_count = 0
     
     for col in date_columns:
-        if col not in df_copy.columns:
-            raise ValueError(f"Column '{col}' not found. Available columns: {list(df_copy.columns)}")
+        preferred_format = None
+        if column_formats is not None and col in column_formats:
+            preferred_format = column_formats[col]
+        elif infer_formats:
+            preferred_format = _column_date_format(df_copy[col], col, format_cache, source)
         
-        def parse_date(date_str):
-            """Try multiple date formats."""
-            if pd.isna(date_str):
-                return pd.NaT
-            
-            # List of common date formats to try
-            formats = [
-                '%m/%d/%Y',      # 01/15/2024
-                '%Y-%m-%d',      # 2024-02-20
-                '%B %d, %Y',     # March 10, 2024
-                '%b %d, %Y',     # Mar 10, 2024
-                '%d/%m/%Y',      # 15/01/2024
-                '%Y/%m/%d',      # 2024/01/15
-            ]
-            
-            for fmt in formats:
-                try:
-                    return pd.to_datetime(date_str, format=fmt)
-                except (ValueError, TypeError):
-                    continue
-            
-            # If all formats fail, try pandas auto-detection
-            try:
-                return pd.to_datetime(date_str)
-            except:
-                return pd.NaT
-        
-        # Apply date parsing
-        df_copy[col] = df_copy[col].apply(parse_date)
+        if value_cache is not None:
+            # Clean each distinct value once, reusing earlier results
+            formatted, valid_dates = _memoize_column(
+                df_copy[col],
+                ("date", preferred_format),
+                lambda values: _format_date_series(values, preferred_format),
+                value_cache
+            )
+        else:
+            formatted, valid_dates = _format_date_series(df_copy[col], preferred_format)
+        _set_column(df_copy, col, formatted)
         
         # Count valid dates
-        valid_dates = df_copy[col].notna().sum()
         conversion_count += valid_dates
-        
-        # Format as YYYY-MM-DD string
-        df_copy[col] = df_copy[col].dt.strftime('%Y-%m-%d')
-        
-        # Replace NaN with empty string
-        df_copy[col] = df_copy[col].fillna('')
     
     return df_copy, conversion_count
 
-def clean_phone_numbers(df, phone_columns):
+# Rows handled by the code-point kernel per block, and their maximum length
+PHONE_BLOCK_ROWS = 100_000
+PHONE_KERNEL_MAX_LENGTH = 64
+
+
+def _layout_phones(core):
+    """
+    Lay out 10-digit numbers as (XXX) XXX-XXXX.
+    
+    Parameters:
+    core (np.ndarray): (n, 10) array of digit code points
+    
+    Returns:
+    np.ndarray: Formatted numbers as an object array of str
+    """
+    out = np.empty((len(core), 14), dtype=np.uint32)
+    out[:, 0] = ord('(')
+    out[:, 1:4] = core[:, 0:3]
+    out[:, 4] = ord(')')
+    out[:, 5] = ord(' ')
+    out[:, 6:9] = core[:, 3:6]
+    out[:, 9] = ord('-')
+    out[:, 10:14] = core[:, 6:10]
+    return out.view('<U14').ravel().astype(object)
+
+
+def _phone_core_codes(block):
+    """
+    Extract the 10-digit core of ASCII phone strings using code-point masks.
+    
+    Parameters:
+    block (np.ndarray): Fixed-width unicode array of ASCII phone strings
+    
+    Returns:
+    tuple: ((k, 10) array of digit code points for valid rows, valid mask)
+    """
+    codes = block.view(np.uint32).reshape(len(block), -1)
+    
+    #Remove extension: ignore everything from the first 'x' on
+    is_x = (codes == ord('x')) | (codes == ord('X'))
+    is_digit = (codes >= ord('0')) & (codes <= ord('9')) & ~np.logical_or.accumulate(is_x, axis=1)
+    
+    #Handle different lengths
+    lengths = is_digit.sum(axis=1)
+    first_digit = codes[np.arange(len(codes)), is_digit.argmax(axis=1)]
+    valid = (lengths == 10) | ((lengths == 11) & (first_digit == ord('1'))) | (lengths > 11)
+    
+    # In every valid case the number is the last 10 digits
+    digits_to_right = np.cumsum(is_digit[:, ::-1], axis=1, dtype=np.int16)[:, ::-1]
+    keep = is_digit & (digits_to_right <= 10)
+    core = codes[valid][keep[valid]].reshape(-1, 10)
+    
+    return core, valid
+
+
+def _phone_core_regex(raw):
+    """
+    Extract the 10-digit core of phone strings with pandas string methods.
+    
+    Used for values the code-point kernel does not handle (non-ASCII or
+    very long strings), where regex digit matching must be kept.
+    
+    Parameters:
+    raw (pd.Series): Phone values as str
+    
+    Returns:
+    tuple: ((k, 10) array of digit code points for valid rows, valid mask)
+    """
+    #Remove extension, then all non-digit characters
+    raw = raw.str.replace(r'[xX][\s\S]*', '', regex=True)
+    digits = raw.str.replace(r'\D', '', regex=True)
+    
+    #Handle different lengths
+    lengths = digits.str.len()
+    valid = (
+        (lengths == 10)
+        | ((lengths == 11) & digits.str.startswith('1'))
+        | (lengths > 11)
+    ).to_numpy()
+    
+    core = digits[valid].str[-10:].to_numpy(dtype='<U10')
+    return core.view(np.uint32).reshape(-1, 10), valid
+
+
+def _format_phone_series(series):
+    """
+    Format a column of raw phone numbers as (XXX) XXX-XXXX.
+    
+    Extensions (anything after an 'x') are dropped and non-digits removed.
+    10 digits are used as-is, 11 digits starting with 1 lose the country
+    code, and longer numbers keep their last 10 digits. Anything else
+    becomes an empty string.
+    
+    Short ASCII values are processed in blocks as fixed-width code-point
+    arrays; the rest go through pandas string methods.
+    
+    Parameters:
+    series (pd.Series): Raw phone values
+    
+    Returns:
+    tuple: (formatted Series, number of valid phone numbers)
+    """
+    values = series.to_numpy(dtype=object)
+    present = np.flatnonzero(pd.notna(values))
+    raw = pd.Series(values[present], dtype=object).astype(str).to_numpy(dtype=object)
+    
+    result = np.full(len(values), "", dtype=object)
+    valid_count = 0
+    
+    lengths = np.fromiter(map(len, raw), dtype=np.int64, count=len(raw))
+    is_ascii = np.fromiter(map(str.isascii, raw), dtype=bool, count=len(raw))
+    use_kernel = is_ascii & (lengths <= PHONE_KERNEL_MAX_LENGTH)
+    
+    kernel_rows = np.flatnonzero(use_kernel)
+    for start in range(0, len(kernel_rows), PHONE_BLOCK_ROWS):
+        rows = kernel_rows[start:start + PHONE_BLOCK_ROWS]
+        core, valid = _phone_core_codes(raw[rows].astype(str))
+        result[present[rows[valid]]] = _layout_phones(core)
+        valid_count += int(valid.sum())
+    
+    other_rows = np.flatnonzero(~use_kernel)
+    if len(other_rows):
+        core, valid = _phone_core_regex(pd.Series(raw[other_rows], dtype=object))
+        result[present[other_rows[valid]]] = _layout_phones(core)
+        valid_count += int(valid.sum())
+    
+    return pd.Series(result, index=series.index), valid_count
+
+
+def clean_phone_numbers(df, phone_columns, value_cache=None, inplace=False):
     """
     Clean and standardize phone numbers to (XXX) XXX-XXXX format.
     Handles extensions, country codes, and various delimiters.
@@ -195,6 +747,9 @@ def clean_phone_numbers(df, phone_columns):
     Parameters:
     df (pd.DataFrame): Input DataFrame
     phone_columns (list): Column names containing phone numbers
+    value_cache (ValueCache or None): Clean distinct values only, memoized
+    inplace (bool): Replace the phone columns in df itself instead of in a
+    copy (for callers that no longer need the original frame)
     
     Returns:
     tuple: (cleaned_df, cleaned_count)
@@ -204,57 +759,73 @@ def clean_phone_numbers(df, phone_columns):
     if not phone_columns:
         raise ValueError("phone_columns cannot be empty")
     
-    df_copy = df.copy()
+    # Check every column first, so a failed call leaves df unchanged
+    for col in phone_columns:
+        if col not in df.columns:
+            raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+    
+    df_copy = df if inplace else df.copy()
     cleaned_count = 0 
     
     for col in phone_columns:
-        if col not in df_copy.columns:
-            raise ValueError(f"Column '{col}' not found. Available columns: {list(df_copy.columns)}")
-        
-        def format_phone(phone):
-            if pd.isna(phone):
-                return ""
-            
-            phone_str = str(phone)
-            
-            #Remove extension
-            if 'x' in phone_str.lower():
-                phone_str = phone_str.lower().split('x')[0]
-            
-            #Remove all non-digit characters
-            digits = re.sub(r'\D', '', phone_str)                       
-            
-            #Handle different lengths
-            if len(digits) == 10:
-                # Standard US format
-                return f"({digits[0:3]}) {digits[3:6]}-{digits[6:10]}"
-            elif len(digits) == 11 and digits[0] == '1':
-                # Remove leading 1 (US country code)
-                return f"({digits[1:4]}) {digits[4:7]}-{digits[7:11]}"
-            elif len(digits) > 11:
-                # Take last 10 digits (handles long extensions)
-                digits = digits[-10:]
-                return f"({digits[0:3]}) {digits[3:6]}-{digits[6:10]}"
-            else:   
-                #Invalid length, return empty
-                return ""
-            
-        #Apply formatting to column
-        df_copy[col] = df_copy[col].apply(format_phone)
+        if value_cache is not None:
+            # Phones are cleaned from their text, so memoize on str(value)
+            phones = df_copy[col].astype(str).where(df_copy[col].notna())
+            formatted, valid_count = _memoize_column(
+                phones, ("phone",), _format_phone_series, value_cache
+            )
+        else:
+            # Format the whole column with vectorized string operations
+            formatted, valid_count = _format_phone_series(df_copy[col])
+        _set_column(df_copy, col, formatted)
         
         #Count successfully formatted numbers
-        cleaned_count += df_copy[col].str.match(r'^\(\d{3}\) \d{3}-\d{4}$', na=False).sum()
+        cleaned_count += valid_count
         
     return df_copy, cleaned_count
         
             
             
-def remove_blank_rows(df):
+# Text values treated as empty cells
+BLANK_TOKENS = ["", 'None', 'null', 'NULL', 'NaN', 'nan', 'Nan', 'NAN']
+
+
+def _blank_text_mask(series):
+    """
+    Flag text cells that are empty, whitespace-only or a null token.
+    
+    Parameters:
+    series (pd.Series): Object, string or category column
+    
+    Returns:
+    np.ndarray: Boolean mask (missing values are not flagged)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Check each category once, then broadcast through the codes
+        categories = pd.Series(series.cat.categories, dtype=object)
+        category_mask = np.append(_blank_text_mask(categories), False)
+        return category_mask[series.cat.codes.to_numpy()]
+    
+    mask = series.isin(BLANK_TOKENS).to_numpy()
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) not in ("string", "mixed", "mixed-integer"):
+        # No str values (e.g. bools, times or only numbers in this chunk), so nothing is whitespace-only
+        return mask
+    mask |= series.str.isspace().to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def remove_blank_rows(df, inplace=False):
     """
     Remove rows where all cells are empty or contain only whitespace.
     
+    Cells that are missing, empty, whitespace-only or a null token such as
+    'NULL' or 'nan' count as blank. In the rows that are kept, blank text
+    cells are replaced with pd.NA.
+    
     Parameters:
     df (pd.DataFrame): Input DataFrame
+    inplace (bool): When no row is removed, reuse df instead of copying it
+    (blank cells are then replaced in df itself)
     
     Returns:
     tuple: (cleaned_df, removed_count)
@@ -263,37 +834,53 @@ def remove_blank_rows(df):
     
     initial_count = len(df)
     
-    df_copy = df.copy()
-    
-    # Enhanced blank detection
-    # 1. Replace empty strings with NaN
-    df_copy = df_copy.replace("", pd.NA)
-    
-    # 2. Replace whitespace-only strings with NaN
-    df_copy = df_copy.replace(r'^\s*$', pd.NA, regex=True)
+    # Rows still blank in every column checked so far
+    row_blank = np.ones(initial_count, dtype=bool)
+    text_masks = {}
     
-    # 3. Replace common "empty" values including 'nan' strings
-    df_copy = df_copy.replace(['None', 'null', 'NULL', 'NaN', 'nan', 'Nan', 'NAN'], pd.NA)
-    
-    # 4. Handle cases where all columns contain 'nan' as string
-    nan_mask = (df_copy.astype(str) == 'nan').all(axis=1)
-    df_copy.loc[nan_mask] = pd.NA
-    
-    # 4. Drop rows where all elements are NaN
-    df_copy = df_copy.dropna(how='all')
-    
-    # Reset index
-    df_copy = df_copy.reset_index(drop=True)
+    # Non-text columns can only be blank when missing, which is cheap to check
+    text_columns = []
+    for i, (_, series) in enumerate(df.items()):
+        if series.dtype == object or isinstance(series.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+            text_columns.append(i)
+        else:
+            row_blank &= series.isna().to_numpy()
+    
+    for i in text_columns:
+        series = df.iloc[:, i]
+        text_mask = _blank_text_mask(series)
+        if text_mask.any():
+            text_masks[i] = text_mask
+        row_blank &= text_mask | series.isna().to_numpy()
+    
+    # Filter once
+    if row_blank.any():
+        cleaned_df = df[~row_blank]
+    else:
+        cleaned_df = df if inplace else df.copy()
+    cleaned_df.index = pd.RangeIndex(len(cleaned_df))
+    
+    # Blank text in the rows that are kept becomes pd.NA
+    for i, text_mask in text_masks.items():
+        keep_mask = text_mask[~row_blank]
+        if keep_mask.any():
+            cleaned_df.isetitem(i, cleaned_df.iloc[:, i].mask(keep_mask, pd.NA))
     
-    removed_count = initial_count - len(df_copy)
+    removed_count = initial_count - len(cleaned_df)
     
-    return df_copy, removed_count
+    return cleaned_df, removed_count
 
-def format_excel_output(file_path):
+def format_excel_output(file_path, column_widths=None, sample_rows=None):
     """Format excel file with bold headers and auto column width..
     
+    Widths are best computed from the DataFrame that was written (see
+    writers.compute_column_widths) and passed in. Without them, the sheet
+    values are read back into a DataFrame and measured the same way.
+    
     Parameters:
     file_path (str): Path to the Excel file.
+    column_widths (list or None): Width per column, in column order.
+    sample_rows (int or None): When measuring the sheet, only read this many rows.
     
     returns:
     None(modifies file in place)
@@ -304,30 +891,24 @@ def format_excel_output(file_path):
     wb = load_workbook(file_path)
     ws = wb.active
     
+    #Measure the sheet only if no widths were given
+    if column_widths is None:
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, ())
+        data = list(islice(rows, sample_rows)) if sample_rows is not None else list(rows)
+        values = pd.DataFrame(data, columns=range(len(header)))
+        values.columns = [str(col) if col is not None else '' for col in header]
+        column_widths = compute_column_widths(values)
+    
     #Make header row bold
     
     for cell in ws[1]: 
         cell.font = Font(bold=True)
         cell.alignment = Alignment(horizontal='center')
         
-    #Auto_adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        
-        for cell in column:
-            try:
-                cell_length = len(str(cell.value))
-                if cell_length > max_length:
-                    max_length = cell_length
-            except:
-                pass
-            
-            
-        #Set the width(add padding)
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column_letter].width = adjusted_width
+    #Set the widths (already padded)
+    for i, width in enumerate(column_widths, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = width
         
     #Save changes
     wb.save(file_path)
-    
\ No newline at end of file
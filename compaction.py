@@ -0,0 +1,100 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from dedup import na_kind_codes
+
+
+# Text columns with at most this share of distinct values become 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+
+def arrow_strings_available():
+    """Return True if pyarrow is installed (needed for string[pyarrow])."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def memory_mb(df):
+    """Memory used by a DataFrame, including the Python objects it holds, in MB."""
+    return round(df.memory_usage(deep=True).sum() / (1024 * 1024), 3)
+
+
+def _compact_column(series, category_max_ratio, use_arrow):
+    """Return the compact version of one column, or None to leave it as is."""
+    if series.dtype == object:
+        # Only pure text columns: converting mixed columns would change values
+        if pd.api.types.infer_dtype(series, skipna=True) != "string":
+            return None
+        # Both new dtypes store one kind of missing value, but deduplication
+        # keeps None, NaN and pd.NA apart
+        missing = series.isna().to_numpy()
+        if missing.any() and len(np.unique(na_kind_codes(series.to_numpy()[missing]))) > 1:
+            return None
+        if series.nunique(dropna=True) <= category_max_ratio * len(series):
+            return series.astype("category")
+        if use_arrow:
+            return series.astype("string[pyarrow]")
+        return None
+    
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return None
+    if pd.api.types.is_integer_dtype(series.dtype):
+        compact = pd.to_numeric(series, downcast="integer")
+    elif pd.api.types.is_float_dtype(series.dtype):
+        compact = pd.to_numeric(series, downcast="float")
+        # Keep float64 unless every value survives float32 exactly
+        if not np.array_equal(compact.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True):
+            return None
+    else:
+        return None
+    return compact if compact.dtype != series.dtype else None
+
+
+def compact_dtypes(df, category_max_ratio=CATEGORY_MAX_RATIO, arrow_strings=True, skip_columns=None):
+    """
+    Store a merged DataFrame in compact dtypes.
+    
+    Text columns with few distinct values (states, product codes) become
+    'category'; other text columns become Arrow-backed string[pyarrow]
+    when pyarrow is installed. Integers are downcast to the smallest type
+    that holds them, and floats to float32 only when no value changes.
+    Columns mixing text and numbers, or mixing kinds of missing values
+    (None, NaN, pd.NA), are left as object. Values are not changed, only
+    how they are stored.
+    
+    The duplicate key column should be passed in skip_columns when the
+    frame is compacted before blank removal: blanking its whitespace-only
+    cells leaves pd.NA next to NaN, which only an object column keeps apart.
+    
+    Parameters:
+    df (pd.DataFrame): Merged DataFrame
+    category_max_ratio (float): Max share of distinct values for 'category'
+    arrow_strings (bool): Use string[pyarrow] for the other text columns
+    skip_columns (list): Columns to leave as they are
+    
+    Returns:
+    tuple: (compact_df, summary) where summary has memory_before_mb,
+    memory_after_mb and the columns changed per new dtype
+    """
+    use_arrow = arrow_strings and arrow_strings_available()
+    summary = {"memory_before_mb": memory_mb(df), "category": [], "string": [], "downcast": []}
+    
+    compact_df = df.copy(deep=False)
+    skip_columns = set(skip_columns or [])
+    for i, (col, series) in enumerate(df.items()):
+        if col in skip_columns:
+            continue
+        compact = _compact_column(series, category_max_ratio, use_arrow)
+        if compact is None:
+            continue
+        compact_df.isetitem(i, compact)
+        if isinstance(compact.dtype, pd.CategoricalDtype):
+            summary["category"].append(col)
+        elif isinstance(compact.dtype, pd.StringDtype):
+            summary["string"].append(col)
+        else:
+            summary["downcast"].append(col)
+    
+    summary["memory_after_mb"] = memory_mb(compact_df)
+    return compact_df, summary
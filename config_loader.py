@@ -1,6 +1,73 @@
 import json
 import sys
 
+from errors import ConfigError
+from readers import EXCEL_ENGINES
+from writers import output_format
+
+def validate_config(config):
+    """Check that a configuration dict has every required key and valid settings.
+    
+    Only the configuration itself is checked (input files are not opened),
+    and pandas is not imported, so this is cheap enough for a dry run.
+    
+    Parameters:
+    config (dict): Configuration dictionary (same structure as config.json)
+    
+    Raises:
+    ConfigError: If a required key is missing or a setting is invalid
+    
+    """
+    if not isinstance(config, dict):
+        raise ConfigError("Configuration must be a JSON object")
+    
+    #Validate required keys
+    required_keys = ['files', 'cleaning_options']
+    
+    for key in required_keys:
+        if key not in config:
+            raise ConfigError(f"Missing required config key: {key}")
+        
+    #Validate files section
+    if 'input_files' not in config['files']:
+        raise ConfigError("Missing 'input_files' in 'files' section of config") 
+    if 'output_file' not in config['files']:
+        raise ConfigError("Missing 'output_file' in 'files' section of config")
+    if not config['files']['input_files']:
+        raise ConfigError("'input_files' cannot be empty")
+    
+    
+    #Validate cleaning options
+    if 'duplicate_column' not in config['cleaning_options']:
+        raise ConfigError("Missing 'duplicate_column' in 'cleaning_options' config")
+    
+    allowed_keep_rules = ["first", "last", False]
+    keep_rule = config['cleaning_options'].get('keep_rule', 'first')
+    if keep_rule not in allowed_keep_rules:
+        raise ConfigError(f"Invalid keep_rule '{keep_rule}'. Allowed values: {allowed_keep_rules}")
+    
+    allowed_key_normalizers = ["strip", "lower", "digits"]
+    for name in config['cleaning_options'].get('key_normalizers') or []:
+        if name not in allowed_key_normalizers:
+            raise ConfigError(f"Invalid key normalizer '{name}'. Allowed values: {allowed_key_normalizers}")
+    
+    fuzzy_max_distance = config['cleaning_options'].get('fuzzy_max_distance', 1)
+    if not isinstance(fuzzy_max_distance, int) or isinstance(fuzzy_max_distance, bool) or fuzzy_max_distance < 0:
+        raise ConfigError(f"Invalid fuzzy_max_distance '{fuzzy_max_distance}'. Use a whole number of edits (0 or more)")
+    fuzzy_window = config['cleaning_options'].get('fuzzy_window', 10)
+    if not isinstance(fuzzy_window, int) or isinstance(fuzzy_window, bool) or fuzzy_window < 2:
+        raise ConfigError(f"Invalid fuzzy_window '{fuzzy_window}'. Use a whole number of 2 or more")
+    
+    #Validate performance options
+    excel_engine = config.get('performance', {}).get('excel_engine', 'auto')
+    if excel_engine not in EXCEL_ENGINES:
+        raise ConfigError(f"Invalid excel_engine '{excel_engine}'. Allowed values: {EXCEL_ENGINES}")
+    try:
+        output_format(config['files']['output_file'])
+    except ValueError as e:
+        raise ConfigError(str(e))
+
+
 def load_config(config_file="config.json"):
     """Load the configuration from Json file.
     
@@ -15,23 +82,7 @@ def load_config(config_file="config.json"):
         with open(config_file, 'r') as f:
             config = json.load(f)
             
-        #Validate required keys
-        required_keys = ['files', 'cleaning_options']
-        
-        for key in required_keys:
-            if key not in config:
-                raise KeyError(f"Missing required config key: {key}")
-            
-        #Validate files section
-        if 'input_files' not in config['files']:
-            raise ValueError("Missing 'input_files' in 'files' section of config") 
-        if 'output_file' not in config['files']:
-            raise ValueError("Missing 'output_file' in 'files' section of config")
-        
-        
-        #Validate cleaning options
-        if 'duplicate_column' not in config['cleaning_options']:
-            raise ValueError("Missing 'duplicate_column' in 'cleaning_options' config")
+        validate_config(config)
         
         return config
     
@@ -0,0 +1,471 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from errors import MissingColumnError
+
+
+# Hash of each kind of missing key. Like drop_duplicates on a single key
+# column, missing keys of the same kind are equal, but None, NaN, pd.NA
+# and NaT in an object column are four different keys (with several key
+# columns, drop_duplicates treats them all as one: the 'nan' hash)
+NA_HASHES = {
+    "nan": np.uint64(0xFFFFFFFFFFFFFFFF),
+    "none": np.uint64(0xFFFFFFFFFFFFFFFE),
+    "na": np.uint64(0xFFFFFFFFFFFFFFFD),
+    "nat": np.uint64(0xFFFFFFFFFFFFFFFC),
+}
+
+# Multiplier used to combine per-column hashes into one row hash
+_COMBINE_PRIME = np.uint64(0x100000001B3)
+
+# Key normalizers by name, applied in the order given (see normalize_key_column)
+KEY_NORMALIZERS = {
+    "strip": lambda text: text.str.strip(),
+    "lower": lambda text: text.str.lower(),
+    "digits": lambda text: text.str.replace(r"\D", "", regex=True),
+}
+
+
+def _hash_values(series):
+    """Hash a Series with pandas' vectorized 64-bit hash."""
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _hash_integers(values):
+    """Hash an int64 array."""
+    return _hash_values(pd.Series(values, dtype=np.int64))
+
+
+def _hash_floats(values):
+    """Hash a float64 array; whole numbers hash like the equivalent integers."""
+    integral = np.isfinite(values) & (np.floor(values) == values) & (np.abs(values) < 2 ** 63)
+    hashes = _hash_values(pd.Series(values, dtype=np.float64))
+    if integral.any():
+        hashes[integral] = _hash_integers(values[integral].astype(np.int64))
+    return hashes
+
+
+def _hash_mixed(values):
+    """
+    Hash an object array holding several kinds of keys.
+    
+    Strings and numbers hash exactly as they would in a column of their
+    own type, so a key hashes the same in every chunk whatever else the
+    chunk contains. Other objects are hashed by type name and text.
+    """
+    hashes = np.empty(len(values), dtype=np.uint64)
+    kinds = np.array([
+        0 if isinstance(value, str)
+        else 1 if isinstance(value, (bool, np.bool_, numbers.Integral)) and -2 ** 63 <= value < 2 ** 63
+        else 2 if isinstance(value, numbers.Real)
+        else 3
+        for value in values
+    ], dtype=np.int8)
+    
+    for kind in range(4):
+        mask = kinds == kind
+        if not mask.any():
+            continue
+        subset = values[mask]
+        if kind == 0:
+            hashes[mask] = _hash_values(pd.Series(subset, dtype=object))
+        elif kind == 1:
+            hashes[mask] = _hash_integers(subset.astype(np.int64))
+        elif kind == 2:
+            hashes[mask] = _hash_floats(subset.astype(np.float64))
+        else:
+            text = [f"\x00{type(value).__name__}:{value}" for value in subset]
+            hashes[mask] = _hash_values(pd.Series(text, dtype=object))
+    return hashes
+
+
+def _na_kind(value):
+    """Kind of a missing value: 'none', 'na', 'nat' or 'nan'."""
+    if value is None:
+        return "none"
+    if value is pd.NA:
+        return "na"
+    if value is pd.NaT or isinstance(value, (np.datetime64, np.timedelta64)):
+        return "nat"
+    return "nan"
+
+
+def na_kind_codes(values):
+    """Position in NA_HASHES of each missing value's kind, as an int64 array."""
+    kinds = list(NA_HASHES)
+    return np.array([kinds.index(_na_kind(value)) for value in values], dtype=np.int64)
+
+
+def _missing_hashes(series, missing):
+    """Hashes of the missing keys of a column, by kind (see NA_HASHES)."""
+    values = series[missing]
+    if series.dtype != object:
+        # A typed column has a single kind of missing value
+        return NA_HASHES[_na_kind(values.iloc[0])]
+    return np.array([NA_HASHES[_na_kind(value)] for value in values.to_numpy()], dtype=np.uint64)
+
+
+def _hash_column(series, na_kinds=True):
+    """
+    Hash one key column to uint64, one value per row.
+    
+    Equal keys hash equally even when chunks of the same column come in
+    with different dtypes (e.g. 5 in an int chunk, 5.0 in a float chunk
+    and 5 in a mixed object chunk), while 1 and '1' stay distinct.
+    Missing keys hash by kind, or all alike when na_kinds is False.
+    """
+    missing = series.isna().to_numpy()
+    dtype = series.dtype
+    
+    if dtype == object:
+        if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+            hashes = _hash_values(series)
+        else:
+            hashes = np.zeros(len(series), dtype=np.uint64)
+            hashes[~missing] = _hash_mixed(series.to_numpy()[~missing])
+    elif pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        hashes = np.zeros(len(series), dtype=np.uint64)
+        hashes[~missing] = _hash_integers(series[~missing].to_numpy(dtype=np.int64))
+    elif pd.api.types.is_float_dtype(dtype):
+        hashes = _hash_floats(series.to_numpy(dtype=np.float64, na_value=np.nan))
+    else:
+        hashes = _hash_values(series)
+    
+    if missing.any():
+        hashes[missing] = _missing_hashes(series, missing) if na_kinds else NA_HASHES["nan"]
+    return hashes
+
+
+def normalize_key_column(series, normalizers):
+    """
+    Normalize the text values of a key column with vectorized string operations.
+    
+    Missing values and values that are not text (numbers, dates) are left
+    as they are. A value that normalizes to '' (e.g. 'n/a' with 'digits')
+    keeps its original value, so such values are not all treated as one key.
+    
+    Parameters:
+    series (pd.Series): Key column
+    normalizers (list): Names from KEY_NORMALIZERS, e.g. ['strip', 'lower']
+    
+    Returns:
+    pd.Series: Normalized keys
+    """
+    for name in normalizers:
+        if name not in KEY_NORMALIZERS:
+            raise ValueError(f"Invalid key normalizer '{name}'. Allowed values: {list(KEY_NORMALIZERS)}")
+    
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    elif not pd.api.types.is_string_dtype(series.dtype):
+        return series
+    
+    text = series
+    is_text = None
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) != "string":
+        # Numbers, bools or a mix: only the str values are normalized
+        is_text = np.fromiter((isinstance(value, str) for value in series.to_numpy()), dtype=bool, count=len(series))
+        if not is_text.any():
+            return series
+        text = series[is_text]
+    
+    normalized = text
+    for name in normalizers:
+        normalized = KEY_NORMALIZERS[name](normalized)
+    normalized = normalized.where(normalized.notna() & (normalized != ''), text)
+    if is_text is None:
+        return normalized
+    
+    values = series.to_numpy(dtype=object, copy=True)
+    values[is_text] = normalized.to_numpy(dtype=object)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def normalized_key_codes(df, columns, normalizers):
+    """
+    Build one int64 key per row from normalized key columns.
+    
+    Each column is factorized, only its distinct values are normalized
+    (see normalize_key_column), and the codes of the normalized values are
+    combined across columns. Rows get the same code exactly when their
+    normalized keys are equal. Missing keys are compared as drop_duplicates
+    does: by kind (see NA_HASHES) for a single key column, all equal for
+    several.
+    
+    Parameters:
+    df (pd.DataFrame): Input rows
+    columns (list): Key columns
+    normalizers (list): Names from KEY_NORMALIZERS
+    
+    Returns:
+    np.ndarray: int64 key per row
+    """
+    keys = None
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])
+        normalized_codes, normalized_uniques = pd.factorize(normalize_key_column(pd.Series(uniques), normalizers))
+        missing = codes < 0
+        codes = np.where(missing, len(normalized_uniques), normalized_codes[codes]).astype(np.int64)
+        # Missing values get code -1. With one key column, each kind of
+        # missing value is its own key; with several, drop_duplicates treats
+        # all of them as one
+        if missing.any() and len(columns) == 1:
+            codes[missing] = len(normalized_uniques) + na_kind_codes(df[col].to_numpy(dtype=object)[missing])
+        if keys is None:
+            keys = codes
+        else:
+            # Renumber the (previous, current) pairs so keys stay below len(df)
+            keys, _ = pd.factorize(keys * (len(normalized_uniques) + len(NA_HASHES)) + codes)
+    return keys
+
+
+def hash_keys(df, columns, normalizers=None):
+    """
+    Hash the key columns of a DataFrame to one uint64 per row.
+    
+    Parameters:
+    df (pd.DataFrame): Input rows
+    columns (list): Key columns
+    normalizers (list or None): Normalize the key text first (see normalize_key_column)
+    
+    Returns:
+    np.ndarray: uint64 hash per row
+    """
+    hashes = None
+    for col in columns:
+        series = df[col] if not normalizers else normalize_key_column(df[col], normalizers)
+        column_hashes = _hash_column(series, na_kinds=len(columns) == 1)
+        if hashes is None:
+            hashes = column_hashes
+        else:
+            hashes = (hashes * _COMBINE_PRIME) ^ column_hashes
+    return hashes
+
+
+class KeyIndex:
+    """
+    Compact set of seen key hashes.
+    
+    Hashes are kept in a few sorted uint64 arrays ("runs"), merged
+    geometrically as they grow, so memory is about 8 bytes per unique
+    key and lookups are vectorized binary searches.
+    
+    Parameters:
+    verify (bool): Also keep the first key seen for each hash, so a hash
+    collision between different keys is detected instead of dropping a
+    row that is not a real duplicate
+    """
+    
+    def __init__(self, verify=False):
+        self._runs = []
+        self._exact = {} if verify else None
+        self.collisions = 0
+    
+    @property
+    def verify(self):
+        return self._exact is not None
+    
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+    
+    def contains(self, hashes):
+        """Return a boolean mask of hashes already in the index."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+        return found
+    
+    def add(self, hashes):
+        """Add hashes that are not in the index yet."""
+        new_run = np.unique(hashes)
+        if len(new_run) == 0:
+            return
+        self._runs.append(new_run)
+        
+        # Keep run sizes decreasing so there are only O(log n) runs
+        while len(self._runs) > 1 and len(self._runs[-1]) * 2 >= len(self._runs[-2]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]), kind='mergesort')
+    
+    def remember(self, hashes, keys):
+        """Record the first key seen for each hash (verify mode only)."""
+        if not self.verify:
+            return
+        for h, key in zip(hashes.tolist(), keys):
+            self._exact.setdefault(h, key)
+    
+    def confirm(self, hashes, keys):
+        """
+        Check hash matches against the stored keys (verify mode only).
+        
+        Returns:
+        np.ndarray: True where the stored key really equals the row's key
+        """
+        if not self.verify:
+            return np.ones(len(hashes), dtype=bool)
+        
+        confirmed = np.empty(len(hashes), dtype=bool)
+        for i, (h, key) in enumerate(zip(hashes.tolist(), keys)):
+            stored = self._exact.get(h, key)
+            confirmed[i] = _same_key(stored, key)
+        self.collisions += int((~confirmed).sum())
+        return confirmed
+
+
+def _same_key(a, b, na_kinds=True):
+    """Key equality where missing values are equal as in hash_keys (see NA_HASHES)."""
+    if isinstance(a, tuple):
+        return all(_same_key(x, y, na_kinds=False) for x, y in zip(a, b))
+    a_missing, b_missing = pd.isna(a), pd.isna(b)
+    if a_missing or b_missing:
+        return a_missing and b_missing and (not na_kinds or _na_kind(a) == _na_kind(b))
+    return a == b
+
+
+def _row_keys(df, columns):
+    """Key values per row (tuples when there are several key columns)."""
+    if len(columns) == 1:
+        return df[columns[0]].tolist()
+    return list(df[columns].itertuples(index=False, name=None))
+
+
+class KeyCounter:
+    """
+    Occurrence count and last position per key hash, for keep='last'/False.
+    
+    Chunks are summarized as sorted runs of (hash, count, last position)
+    and merged as they grow, so memory scales with unique keys.
+    """
+    
+    def __init__(self):
+        self._runs = []
+        self._final = None
+    
+    @staticmethod
+    def _reduce(hashes, counts, last_positions):
+        order = np.argsort(hashes, kind='mergesort')
+        hashes, counts, last_positions = hashes[order], counts[order], last_positions[order]
+        unique, starts = np.unique(hashes, return_index=True)
+        return (
+            unique,
+            np.add.reduceat(counts, starts),
+            np.maximum.reduceat(last_positions, starts),
+        )
+    
+    def add(self, hashes, positions):
+        """Count hashes seen at the given global row positions."""
+        if len(hashes) == 0:
+            return
+        self._runs.append(self._reduce(hashes, np.ones(len(hashes), dtype=np.int64), positions))
+        while len(self._runs) > 1 and len(self._runs[-1][0]) * 2 >= len(self._runs[-2][0]):
+            last = self._runs.pop()
+            previous = self._runs.pop()
+            self._runs.append(self._reduce(*(np.concatenate(pair) for pair in zip(previous, last))))
+    
+    def lookup(self, hashes):
+        """
+        Return (count, last position) for each hash (all must have been added).
+        """
+        if self._final is None:
+            if len(self._runs) > 1:
+                self._runs = [self._reduce(*(np.concatenate(parts) for parts in zip(*self._runs)))]
+            self._final = self._runs[0] if self._runs else (
+                np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            )
+        unique, counts, last_positions = self._final
+        positions = np.searchsorted(unique, hashes)
+        return counts[positions], last_positions[positions]
+
+
+class StreamingDeduplicator:
+    """
+    Deduplicate rows that arrive in chunks, across chunks and files.
+    
+    keep_rule 'first' works in a single pass with a KeyIndex of seen keys.
+    'last' and False need to know about later rows, so every chunk must
+    first be passed to observe(); filter() is then called on the same
+    chunks, in the same order, in a second pass.
+    
+    Parameters:
+    columns (list): Key columns
+    keep_rule (str or False): 'first', 'last', or False
+    verify (bool): Confirm hash matches against stored keys ('first' only)
+    normalizers (list or None): Compare keys after these KEY_NORMALIZERS
+    """
+    
+    def __init__(self, columns, keep_rule="first", verify=False, normalizers=None):
+        allowed_keep_rules = ["first", "last", False]
+        if keep_rule not in allowed_keep_rules:
+            raise ValueError(f"Invalid keep_rule '{keep_rule}'. Allowed values: {allowed_keep_rules}")
+        
+        self.columns = list(columns)
+        self.keep_rule = keep_rule
+        self.normalizers = normalizers
+        self.index = KeyIndex(verify=verify)
+        self.counter = KeyCounter()
+        self._observed_rows = 0
+        self._filtered_rows = 0
+    
+    @property
+    def needs_observation(self):
+        """True if all chunks must be passed to observe() before filter()."""
+        return self.keep_rule != "first"
+    
+    def _check_columns(self, df):
+        for col in self.columns:
+            if col not in df.columns:
+                raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+    
+    def _key_frame(self, df):
+        """The key columns as they are compared (normalized if normalizers are set)."""
+        if not self.normalizers:
+            return df
+        return pd.DataFrame({col: normalize_key_column(df[col], self.normalizers) for col in self.columns})
+    
+    def observe(self, df):
+        """First pass (keep_rule 'last'/False): count the chunk's keys."""
+        self._check_columns(df)
+        positions = np.arange(self._observed_rows, self._observed_rows + len(df), dtype=np.int64)
+        self.counter.add(hash_keys(self._key_frame(df), self.columns), positions)
+        self._observed_rows += len(df)
+    
+    def filter(self, df):
+        """
+        Drop the chunk's duplicate rows.
+        
+        Returns:
+        tuple: (deduplicated_df, removed_count)
+        """
+        self._check_columns(df)
+        if len(df) == 0:
+            return df, 0
+        
+        key_df = self._key_frame(df)
+        hashes = hash_keys(key_df, self.columns)
+        
+        if self.keep_rule == "first":
+            seen = self.index.contains(hashes)
+            duplicate = pd.Series(hashes).duplicated(keep="first").to_numpy() | seen
+            if self.index.verify:
+                keys = _row_keys(key_df, self.columns)
+                first_rows = np.flatnonzero(~duplicate)
+                self.index.remember(hashes[first_rows], [keys[i] for i in first_rows])
+                # Rows whose hash matched a different key are not duplicates
+                matched = np.flatnonzero(duplicate)
+                confirmed = self.index.confirm(hashes[matched], [keys[i] for i in matched])
+                duplicate[matched[~confirmed]] = False
+            self.index.add(hashes[~seen])
+        else:
+            positions = np.arange(self._filtered_rows, self._filtered_rows + len(df), dtype=np.int64)
+            counts, last_positions = self.counter.lookup(hashes)
+            if self.keep_rule == "last":
+                duplicate = last_positions != positions
+            else:
+                duplicate = counts > 1
+        
+        self._filtered_rows += len(df)
+        return df[~duplicate], int(duplicate.sum())
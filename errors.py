@@ -0,0 +1,22 @@
+class PipelineError(Exception):
+    """Base class for errors raised by the cleaning pipeline."""
+
+
+class ConfigError(PipelineError, ValueError):
+    """The configuration is missing a required key or has an invalid value."""
+
+
+class InputFileError(PipelineError, FileNotFoundError):
+    """An input file does not exist or cannot be opened."""
+
+
+class ColumnMismatchError(PipelineError, ValueError):
+    """An input file's columns differ from the first file's."""
+
+
+class MissingColumnError(PipelineError, ValueError):
+    """A column named in the configuration is not in the data."""
+
+
+class OutputError(PipelineError):
+    """The output file could not be written."""
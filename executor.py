@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import remove_blank_rows, standardize_dates, clean_phone_numbers
+from dedup import StreamingDeduplicator
+from instrumentation import RunReport
+from planner import StagePlan
+
+
+# Target size of one row block: small enough that a block stays in the
+# L2/L3 cache while it goes through every stage
+BLOCK_TARGET_BYTES = 8 * 1024 * 1024
+MIN_BLOCK_ROWS = 2_048
+MAX_BLOCK_ROWS = 1_000_000
+
+
+def block_rows_for(df, target_bytes=BLOCK_TARGET_BYTES):
+    """
+    Rows per block so one block of df takes about target_bytes.
+    
+    Row size is measured on the first rows, including the Python string
+    objects they hold.
+    """
+    sample = df.iloc[:1000]
+    if len(sample) == 0:
+        return MIN_BLOCK_ROWS
+    bytes_per_row = max(1.0, sample.memory_usage(deep=True, index=False).sum() / len(sample))
+    return int(min(MAX_BLOCK_ROWS, max(MIN_BLOCK_ROWS, target_bytes // bytes_per_row)))
+
+
+class BlockPlan:
+    """
+    The cleaning stages of one run, compiled once and applied block by block.
+    
+    Each block goes through blank-row removal, deduplication (with key
+    hashes carried across blocks), date and phone cleaning before the next
+    block is read, and every stage's counts are added up over the blocks.
+    Blocks are numbered 0..n-1 after blank removal, like the whole-frame
+    stage, so the concatenated blocks equal the stage-by-stage result.
+    
+    A date or phone setting that fails on the first block (no columns, or
+    a missing column) is recorded in date_error / phone_error and that
+    stage is skipped from then on.
+    
+    keep_rule 'last' or False needs every block passed to observe() first
+    (see StreamingDeduplicator). With normalize_key, the stage order comes
+    from a StagePlan (see planner.py).
+    
+    Parameters:
+    duplicate_column (str): Column used to detect duplicates
+    date_columns (list): Date columns to standardize
+    phone_columns (list): Phone columns to clean
+    keep_rule (str or False): 'first', 'last', or False
+    verify_keys (bool): Confirm hash matches against stored keys (keep 'first')
+    date_options (dict or None): Extra keyword arguments for standardize_dates
+    value_cache (ValueCache or None): Memoization cache for dates/phones
+    normalize_key (bool): Clean the duplicate column before deduplicating
+    key_normalizers (list or None): Compare keys after these dedup.KEY_NORMALIZERS
+    """
+    
+    def __init__(self, duplicate_column, date_columns, phone_columns, keep_rule="first", verify_keys=False,
+                 date_options=None, value_cache=None, normalize_key=False, key_normalizers=None):
+        self.stages = StagePlan(duplicate_column, date_columns, phone_columns, normalize_key=normalize_key)
+        self.dedup = StreamingDeduplicator(
+            [self.stages.dedup_column], keep_rule=keep_rule, verify=verify_keys, normalizers=key_normalizers
+        )
+        self.date_options = date_options or {}
+        self.value_cache = value_cache
+        self.counts = {
+            "blocks": 0,
+            "rows_before": 0,
+            "blanks_removed": 0,
+            "duplicates_removed": 0,
+            "dates_fixed": 0,
+            "phone_fixed": 0,
+            "rows_after": 0,
+        }
+        self.date_error = None
+        self.phone_error = None
+        self._kept_rows = 0
+    
+    @property
+    def needs_observation(self):
+        """True if every block must be passed to observe() before run_block()."""
+        return self.dedup.needs_observation
+    
+    def observe(self, block):
+        """First pass (keep_rule 'last'/False): count the keys of the block's non-blank rows."""
+        block, _ = remove_blank_rows(block, inplace=True)
+        if self.stages.key_stage:
+            block, _ = self.stages.normalize_key(block, self.value_cache, self.date_options)
+        self.dedup.observe(block)
+    
+    def run_block(self, block, report):
+        """Run every stage on one block and return the cleaned block."""
+        counts = self.counts
+        counts["blocks"] += 1
+        counts["rows_before"] += len(block)
+        
+        with report.stage("blank_rows", rows_in=len(block)) as stage:
+            block, blanks_removed = remove_blank_rows(block, inplace=True)
+            block.index = pd.RangeIndex(self._kept_rows, self._kept_rows + len(block))
+            stage["rows_out"] = len(block)
+        self._kept_rows += len(block)
+        counts["blanks_removed"] += blanks_removed
+        
+        stages = self.stages
+        if stages.key_stage:
+            with report.stage(f"key_{stages.key_stage}", rows_in=len(block)) as stage:
+                block, _ = stages.normalize_key(block, self.value_cache, self.date_options)
+                stage["rows_out"] = len(block)
+        
+        with report.stage("dedup", rows_in=len(block)) as stage:
+            block, duplicates_removed = self.dedup.filter(block)
+            block = stages.drop_key(block)
+            stage["rows_out"] = len(block)
+        counts["duplicates_removed"] += duplicates_removed
+        
+        if self.date_error is None and not stages.skips("dates"):
+            try:
+                with report.stage("dates", rows_in=len(block)) as stage:
+                    block, dates_fixed = standardize_dates(
+                        block, date_columns=stages.columns("dates"), value_cache=self.value_cache,
+                        inplace=True, **self.date_options
+                    )
+                    stage["rows_out"] = len(block)
+                counts["dates_fixed"] += dates_fixed
+            except ValueError as e:
+                self.date_error = str(e)
+        counts["dates_fixed"] += stages.key_fixed(block, "dates")
+        
+        if self.phone_error is None and not stages.skips("phones"):
+            try:
+                with report.stage("phones", rows_in=len(block)) as stage:
+                    block, phone_fixed = clean_phone_numbers(
+                        block, phone_columns=stages.columns("phones"), value_cache=self.value_cache, inplace=True
+                    )
+                    stage["rows_out"] = len(block)
+                counts["phone_fixed"] += phone_fixed
+            except ValueError as e:
+                self.phone_error = str(e)
+        counts["phone_fixed"] += stages.key_fixed(block, "phones")
+        
+        counts["rows_after"] += len(block)
+        return block
+    
+    def summary(self):
+        """Counts per stage plus date_error / phone_error and rows_saved."""
+        return dict(self.counts, date_error=self.date_error, phone_error=self.phone_error,
+                    rows_saved=self.stages.rows_saved(self.counts["duplicates_removed"]))
+
+
+def _concat_blocks(blocks):
+    """
+    pd.concat the cleaned blocks, keeping the values of object columns.
+    
+    pd.concat fills a column that is all-missing in one block with NaN,
+    so a block's None or pd.NA keys would not match the whole-frame result.
+    """
+    if len(blocks) == 1:
+        return blocks[0]
+    df = pd.concat(blocks)
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            df.isetitem(i, np.concatenate([block.iloc[:, i].to_numpy() for block in blocks]))
+    return df
+
+
+def run_fused(df, plan, block_rows=None, report=None):
+    """
+    Clean an in-memory frame in one sweep of row blocks.
+    
+    Gives the same frame as running remove_blank_rows, remove_duplicates,
+    standardize_dates and clean_phone_numbers one after the other, but no
+    stage ever materializes a full-size intermediate frame.
+    
+    Parameters:
+    df (pd.DataFrame): Merged input rows
+    plan (BlockPlan): Compiled stages
+    block_rows (int or None): Rows per block (None = sized by block_rows_for)
+    report (RunReport or None): Collects per-stage timings (summed over blocks)
+    
+    Returns:
+    tuple: (cleaned_df, summary) where summary is plan.summary()
+    """
+    report = report if report is not None else RunReport()
+    block_rows = block_rows or block_rows_for(df)
+    starts = range(0, len(df), block_rows)
+    
+    if plan.needs_observation:
+        with report.stage("dedup_observe"):
+            for start in starts:
+                plan.observe(df.iloc[start:start + block_rows])
+    
+    blocks = [plan.run_block(df.iloc[start:start + block_rows], report) for start in starts]
+    if not blocks:
+        # Still run the stages once so an empty frame gets the same columns
+        blocks = [plan.run_block(df, report)]
+    
+    summary = plan.summary()
+    summary["block_rows"] = block_rows
+    return _concat_blocks(blocks), summary
@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+
+from dedup import na_kind_codes, normalize_key_column
+from errors import MissingColumnError
+
+
+# Defaults for fuzzy deduplication
+FUZZY_MAX_DISTANCE = 1
+FUZZY_WINDOW = 10
+FUZZY_NORMALIZERS = ["strip", "lower"]
+
+# Keys up to this length are scored by the code-point kernel, in batches
+# of this many pairs; longer keys use bounded_edit_distance
+FUZZY_KERNEL_MAX_LENGTH = 64
+FUZZY_BATCH_PAIRS = 200_000
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    Levenshtein distance between two strings, capped at max_distance + 1.
+    
+    Only the diagonal band of width 2 * max_distance + 1 is computed, so
+    the cost is O(len(a) * max_distance) instead of O(len(a) * len(b)).
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    
+    previous = {j: j for j in range(0, min(len(b), max_distance) + 1)}
+    for i in range(1, len(a) + 1):
+        current = {}
+        if i <= max_distance:
+            current[0] = i
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            current[j] = min(
+                previous.get(j - 1, too_far) + (a[i - 1] != b[j - 1]),
+                previous.get(j, too_far) + 1,
+                current.get(j - 1, too_far) + 1,
+                too_far,
+            )
+        if min(current.values(), default=too_far) >= too_far:
+            return too_far
+        previous = current
+    return previous.get(len(b), too_far)
+
+
+def _banded_distances(a, a_len, b, b_len, max_distance):
+    """
+    Bounded edit distance for many pairs at once.
+    
+    Parameters:
+    a, b (np.ndarray): (pairs, width) arrays of code points, zero-padded
+    a_len, b_len (np.ndarray): String lengths
+    max_distance (int): Distances above this are returned as max_distance + 1
+    
+    Returns:
+    np.ndarray: Distance per pair
+    """
+    too_far = max_distance + 1
+    pairs, width = a.shape
+    offsets = np.arange(-max_distance, max_distance + 1)
+    band = len(offsets)
+    
+    # Row i of the DP table is kept as D[i][i + offset] for each offset
+    previous = np.where(offsets >= 0, offsets, too_far).astype(np.int16)
+    previous = np.broadcast_to(previous, (pairs, band)).copy()
+    previous[offsets[None, :] > b_len[:, None]] = too_far
+    
+    distances = np.full(pairs, too_far, dtype=np.int16)
+    empty = a_len == 0
+    distances[empty] = np.minimum(b_len[empty], too_far)
+    
+    # Pairs still being computed: their string has not ended and some cell is in range
+    alive = np.flatnonzero(a_len > 0)
+    previous = previous[alive]
+    for i in range(1, width + 1):
+        if len(alive) == 0:
+            break
+        current = np.full((len(alive), band), too_far, dtype=np.int16)
+        a_char = a[alive, i - 1]
+        alive_b_len = b_len[alive]
+        for k, offset in enumerate(offsets):
+            j = i + offset
+            if j < 0:
+                continue
+            if j == 0:
+                current[:, k] = min(i, too_far)
+                continue
+            if j > width:
+                continue
+            value = previous[:, k] + (a_char != b[alive, j - 1])
+            if k + 1 < band:
+                value = np.minimum(value, previous[:, k + 1] + 1)
+            if k > 0:
+                value = np.minimum(value, current[:, k - 1] + 1)
+            current[:, k] = np.minimum(value, too_far)
+            current[j > alive_b_len, k] = too_far
+        
+        # Pairs whose first string ends at row i read their distance here
+        ends = a_len[alive] == i
+        if ends.any():
+            offset = alive_b_len[ends] - i
+            inside = np.abs(offset) <= max_distance
+            distances[alive[ends][inside]] = current[np.flatnonzero(ends)[inside], offset[inside] + max_distance]
+        
+        keep = ~ends & (current.min(axis=1) < too_far)
+        alive, previous = alive[keep], current[keep]
+    return distances
+
+
+def _code_points(texts, width):
+    """Fixed-width (n, width) uint32 code points of a list of strings."""
+    return np.asarray(texts, dtype=f"<U{max(width, 1)}").view(np.uint32).reshape(len(texts), max(width, 1))
+
+
+def _score_pairs(texts, lengths, left, right, max_distance):
+    """Bounded edit distance of texts[left] and texts[right], pair by pair."""
+    distances = np.empty(len(left), dtype=np.int16)
+    short = (lengths[left] <= FUZZY_KERNEL_MAX_LENGTH) & (lengths[right] <= FUZZY_KERNEL_MAX_LENGTH)
+    
+    short_rows = np.flatnonzero(short)
+    for start in range(0, len(short_rows), FUZZY_BATCH_PAIRS):
+        rows = short_rows[start:start + FUZZY_BATCH_PAIRS]
+        a_len, b_len = lengths[left[rows]], lengths[right[rows]]
+        width = int(max(a_len.max(), b_len.max()))
+        distances[rows] = _banded_distances(
+            _code_points(texts[left[rows]].tolist(), width), a_len,
+            _code_points(texts[right[rows]].tolist(), width), b_len,
+            max_distance
+        )
+    
+    for row in np.flatnonzero(~short):
+        distances[row] = bounded_edit_distance(texts[left[row]], texts[right[row]], max_distance)
+    return distances
+
+
+def _neighbor_pairs(order, blocks, window):
+    """Pairs of units at most window - 1 apart in order, within the same block."""
+    lefts, rights = [], []
+    for step in range(1, window):
+        left, right = order[:-step], order[step:]
+        same_block = blocks[left] == blocks[right]
+        lefts.append(left[same_block])
+        rights.append(right[same_block])
+    if not lefts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(lefts), np.concatenate(rights)
+
+
+def _connected_labels(count, left, right):
+    """Smallest member of each connected component, for every node 0..count-1."""
+    labels = np.arange(count, dtype=np.int64)
+    while True:
+        linked = np.minimum(labels[left], labels[right])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, left, linked)
+        np.minimum.at(new_labels, right, linked)
+        # Pointer jumping: follow each label to its own label until stable
+        while True:
+            jumped = new_labels[new_labels]
+            if np.array_equal(jumped, new_labels):
+                break
+            new_labels = jumped
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def remove_fuzzy_duplicates(df, column, keep_rule="first", max_distance=FUZZY_MAX_DISTANCE,
+                            window=FUZZY_WINDOW, block_column=None, normalizers=None):
+    """
+    Remove rows whose keys are near-duplicates (typos) of another row's key.
+    
+    Keys are normalized (strip and lower by default), and exact duplicates
+    are grouped first. Candidate pairs of distinct keys come from a sorted
+    neighborhood: keys are sorted, and each is compared with the next
+    window - 1 keys, once in normal order and once sorted by the reversed
+    key (so a typo in the first characters is still found). With
+    block_column, keys are only compared with keys in the same block
+    (e.g. the same ZIP code). A pair is a match when its edit distance is
+    at most max_distance. Matches are transitive: if a~b and b~c, all
+    three rows are one group and keep_rule picks the rows kept.
+    
+    Parameters:
+    df (pd.DataFrame): Input DataFrame
+    column (str): Key column
+    keep_rule (str or False): 'first', 'last', or False
+    max_distance (int): Largest edit distance counted as a duplicate
+    window (int): Sorted-neighborhood window size
+    block_column (str or None): Only compare keys with the same value here
+    normalizers (list or None): dedup.KEY_NORMALIZERS applied first
+    (None = strip and lower)
+    
+    Returns:
+    tuple: (cleaned_df, summary) where summary has duplicates_removed,
+    distinct_keys, candidate_pairs (pairs scored) and fuzzy_pairs (pairs
+    within max_distance)
+    """
+    allowed_keep_rules = ["first", "last", False]
+    if keep_rule not in allowed_keep_rules:
+        raise ValueError(f"Invalid keep_rule '{keep_rule}'. Allowed values: {allowed_keep_rules}")
+    for col in [column] + ([block_column] if block_column else []):
+        if col not in df.columns:
+            raise MissingColumnError(f"Column '{col}' not found. Available columns: {list(df.columns)}")
+    
+    key = normalize_key_column(df[column], FUZZY_NORMALIZERS if normalizers is None else normalizers)
+    key_codes, keys = pd.factorize(key)
+    block_codes = np.zeros(len(df), dtype=np.int64)
+    if block_column:
+        block_codes = pd.factorize(df[block_column])[0].astype(np.int64) + 1
+    
+    # A unit is one distinct (block, key); missing keys (code -1) are not compared
+    has_key = key_codes >= 0
+    block_count = int(block_codes.max()) + 1 if len(df) else 1
+    unit_codes = np.full(len(df), -1, dtype=np.int64)
+    codes, unit_index = pd.factorize(key_codes[has_key].astype(np.int64) * block_count + block_codes[has_key])
+    unit_codes[has_key] = codes
+    unit_index = np.asarray(unit_index, dtype=np.int64)
+    unit_keys = unit_index // block_count
+    unit_blocks = unit_index % block_count
+    texts = np.array([str(value) for value in keys], dtype=object)[unit_keys]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    
+    # Candidate pairs: neighbors in key order and in reversed-key order
+    orders = pd.DataFrame({"block": unit_blocks, "key": texts, "reversed": [text[::-1] for text in texts]})
+    left, right = [], []
+    for sort_key in ("key", "reversed"):
+        order = orders.sort_values(["block", sort_key], kind="mergesort").index.to_numpy()
+        pair_left, pair_right = _neighbor_pairs(order, unit_blocks, window)
+        left.append(pair_left)
+        right.append(pair_right)
+    left, right = np.concatenate(left), np.concatenate(right)
+    
+    # Each pair once, and only if the lengths are close enough to match
+    left, right = np.minimum(left, right), np.maximum(left, right)
+    pairs = np.sort(left * max(len(texts), 1) + right)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    left, right = pairs // max(len(texts), 1), pairs % max(len(texts), 1)
+    close = (np.abs(lengths[left] - lengths[right]) <= max_distance) & (unit_keys[left] != unit_keys[right])
+    left, right = left[close], right[close]
+    
+    matched = _score_pairs(texts, lengths, left, right, max_distance) <= max_distance
+    
+    # The same key in several blocks is still an exact duplicate
+    first_unit = np.full(len(keys), -1, dtype=np.int64)
+    first_unit[unit_keys[::-1]] = np.arange(len(texts))[::-1]
+    labels = _connected_labels(
+        len(texts),
+        np.concatenate([left[matched], np.arange(len(texts))]),
+        np.concatenate([right[matched], first_unit[unit_keys]])
+    )
+    
+    # Missing keys are grouped by kind (None, NaN, pd.NA, NaT), as in drop_duplicates
+    groups = np.zeros(len(df), dtype=np.int64)
+    groups[has_key] = labels[unit_codes[has_key]]
+    groups[~has_key] = -1 - na_kind_codes(df[column].to_numpy(dtype=object)[~has_key])
+    duplicate = pd.Series(groups).duplicated(keep=keep_rule).to_numpy()
+    cleaned_df = df[~duplicate]
+    
+    summary = {
+        "duplicates_removed": int(duplicate.sum()),
+        "distinct_keys": len(keys),
+        "candidate_pairs": int(len(left)),
+        "fuzzy_pairs": int(matched.sum()),
+    }
+    return cleaned_df, summary
@@ -0,0 +1,309 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cleaner import remove_blank_rows, standardize_dates, clean_phone_numbers
+from readers import read_file
+
+
+# Bump when the cleaning steps change so old cached frames are not reused
+# (it is part of every cache key, and an older manifest is discarded)
+CACHE_VERSION = 2
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "manifest.lock"
+
+# A lock file older than this is left over from a crashed run and is removed
+LOCK_STALE_SECONDS = 30
+
+# Hidden column holding the uncleaned duplicate key when that column is
+# also a date/phone column (dedup must see the values as they were read)
+RAW_KEY_COLUMN = "__raw_duplicate_key__"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _manifest_lock(cache_dir, poll_seconds=0.05):
+    """
+    Hold an exclusive lock on the manifest of cache_dir.
+    
+    The lock is a file created with O_EXCL, so it works on every platform
+    and between unrelated processes (e.g. parallel batch jobs).
+    """
+    lock_path = os.path.join(cache_dir, LOCK_NAME)
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(poll_seconds)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def _write_atomic(path, write):
+    """Write a file through a unique temp file in the same directory, then rename it."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _arrow_safe(df):
+    """
+    True if the frame round-trips through Parquet unchanged.
+    
+    Parquet reads every missing text value back as None, while the cleaned
+    frame holds NaN (from the reader) and pd.NA (blanked cells), which
+    deduplication keeps apart. Object columns with missing values are
+    therefore pickled.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return not any(
+        df[col].dtype == object
+        and (pd.api.types.infer_dtype(df[col], skipna=True) != "string" or df[col].isna().any())
+        for col in df.columns
+    )
+
+
+class IncrementalCache:
+    """
+    Manifest of input files plus a cache of each file's cleaned frame.
+    
+    The manifest remembers every input's size, mtime and SHA-256, so an
+    unchanged file is recognized without re-hashing it. Cleaned frames
+    are stored per (file contents, cleaning settings) as Parquet (or as a
+    pickle when pyarrow is missing or a column mixes types). When the
+    cache grows past max_size_mb, the least recently used frames are
+    deleted.
+    
+    Parameters:
+    cache_dir (str): Directory holding the manifest and cached frames
+    max_size_mb (float): Size limit for the cached frames
+    """
+    
+    def __init__(self, cache_dir, max_size_mb=500):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        self.manifest = self._load_manifest()
+    
+    def _load_manifest(self):
+        """The manifest on disk, or an empty one if it is missing, damaged or outdated."""
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == CACHE_VERSION:
+                    return manifest
+            except (json.JSONDecodeError, OSError):
+                # A damaged manifest only costs a full rebuild
+                pass
+        return {"version": CACHE_VERSION, "files": {}, "entries": {}}
+    
+    def file_hash(self, path):
+        """Content hash of an input, reusing the stored one if size and mtime match."""
+        stat = os.stat(path)
+        known = self.manifest["files"].get(os.path.abspath(path))
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        
+        sha256 = file_sha256(path)
+        self.manifest["files"][os.path.abspath(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+        return sha256
+    
+    def _key(self, path, settings):
+        payload = json.dumps(
+            {"version": CACHE_VERSION, "sha256": self.file_hash(path), "settings": settings},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+    
+    def get(self, path, settings):
+        """
+        Return the cached (df, stats) for a file and settings, or None.
+        """
+        key = self._key(path, settings)
+        entry = self.manifest["entries"].get(key)
+        data_path = os.path.join(self.cache_dir, entry["data_file"]) if entry else None
+        if entry is None or not os.path.exists(data_path):
+            self.misses += 1
+            return None
+        
+        try:
+            if entry["format"] == "parquet":
+                df = pd.read_parquet(data_path)
+            else:
+                with open(data_path, 'rb') as f:
+                    df = pickle.load(f)
+        except Exception:
+            # Unreadable cache file: treat as a miss and let it be rewritten
+            self.misses += 1
+            return None
+        
+        entry["last_used"] = time.time()
+        self.hits += 1
+        return df, entry["stats"]
+    
+    def put(self, path, settings, df, stats):
+        """Store a file's cleaned frame and stats, then evict if over the size limit."""
+        key = self._key(path, settings)
+        # Written atomically: another run may be reading or writing the same entry
+        if _arrow_safe(df):
+            data_file, file_format = f"{key}.parquet", "parquet"
+            _write_atomic(os.path.join(self.cache_dir, data_file), lambda f: df.to_parquet(f, index=False))
+        else:
+            data_file, file_format = f"{key}.pkl", "pickle"
+            _write_atomic(os.path.join(self.cache_dir, data_file),
+                          lambda f: pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL))
+        
+        self.manifest["entries"][key] = {
+            "source": os.path.abspath(path),
+            "data_file": data_file,
+            "format": file_format,
+            "bytes": os.path.getsize(os.path.join(self.cache_dir, data_file)),
+            "last_used": time.time(),
+            "stats": stats,
+        }
+        self.evict(keep=key)
+    
+    def size_bytes(self):
+        """Total size of the cached frames."""
+        return sum(entry["bytes"] for entry in self.manifest["entries"].values())
+    
+    def evict(self, keep=None):
+        """Delete least recently used frames until the cache fits max_size_mb."""
+        entries = self.manifest["entries"]
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if self.size_bytes() <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entries[key]["data_file"]))
+            except FileNotFoundError:
+                pass
+            del entries[key]
+            self.evicted += 1
+    
+    def save(self):
+        """
+        Merge this run's changes into the manifest on disk and write it atomically.
+        
+        Runs sharing cache_dir (e.g. parallel batch jobs) may have saved since
+        this one loaded the manifest, so it is re-read under a lock and this
+        run's files and entries are added to it. Entries whose frame was
+        evicted, by this run or another, are dropped.
+        """
+        with _manifest_lock(self.cache_dir):
+            manifest = self._load_manifest()
+            manifest["files"].update(self.manifest["files"])
+            manifest["entries"].update(self.manifest["entries"])
+            manifest["entries"] = {
+                key: entry for key, entry in manifest["entries"].items()
+                if os.path.exists(os.path.join(self.cache_dir, entry["data_file"]))
+            }
+            _write_atomic(os.path.join(self.cache_dir, MANIFEST_NAME),
+                          lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+        self.manifest = manifest
+
+
+def clean_single_file(path, duplicate_column, date_columns, phone_columns, sheet_name=0,
+                      excel_engine="auto", columns=None, date_options=None, value_cache=None):
+    """
+    Read one file and run the per-row cleaning steps on it.
+    
+    Blank rows, dates and phones only depend on each row, so cleaning
+    files one by one gives the same rows as cleaning the merged frame.
+    If the duplicate column is also cleaned, its original values are kept
+    in RAW_KEY_COLUMN so deduplication still sees the values as read.
+    
+    Returns:
+    tuple: (cleaned_df, stats) where stats has rows_before, blanks_removed,
+    date_error and phone_error
+    """
+    df = read_file(path, sheet_name=sheet_name, engine=excel_engine, columns=columns)
+    stats = {"rows_before": len(df), "blanks_removed": 0, "date_error": None, "phone_error": None}
+    
+    df, stats["blanks_removed"] = remove_blank_rows(df, inplace=True)
+    
+    if duplicate_column in date_columns or duplicate_column in phone_columns:
+        df[RAW_KEY_COLUMN] = df[duplicate_column]
+    
+    try:
+        df, _ = standardize_dates(df, date_columns=date_columns, value_cache=value_cache, inplace=True,
+                                  **(date_options or {}))
+    except ValueError as e:
+        stats["date_error"] = str(e)
+    
+    try:
+        df, _ = clean_phone_numbers(df, phone_columns=phone_columns, value_cache=value_cache, inplace=True)
+    except ValueError as e:
+        stats["phone_error"] = str(e)
+    
+    return df, stats
+
+
+def load_cleaned_files(file_paths, cache, settings, clean_file):
+    """
+    Return the cleaned frame of every file, from the cache when possible.
+    
+    Parameters:
+    file_paths (list): Input files, in order
+    cache (IncrementalCache): Manifest and frame cache
+    settings (dict): Everything that affects the cleaned frame (part of the cache key)
+    clean_file (callable): clean_file(path) -> (df, stats) for cache misses
+    
+    Returns:
+    list: (df, stats, from_cache) per file, in the original order
+    """
+    results = []
+    for path in file_paths:
+        cached = cache.get(path, settings)
+        if cached is not None:
+            results.append((cached[0], cached[1], True))
+            continue
+        df, stats = clean_file(path)
+        cache.put(path, settings, df, stats)
+        results.append((df, stats, False))
+    cache.save()
+    return results
@@ -0,0 +1,142 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows: RSS figures are then left out of the report
+    resource = None
+
+
+def process_peak_rss_mb():
+    """
+    Peak resident memory of this process so far, in MB (None if unknown).
+    
+    This is the high-water mark since the process started (ru_maxrss),
+    not the peak of any one stage.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def report_path(output_file):
+    """Path of the JSON run report written next to an output file."""
+    return f"{output_file}.report.json"
+
+
+class RunReport:
+    """
+    Per-stage timing, memory and row counts for one pipeline run.
+    
+    Wrap each stage in `with report.stage(name, rows_in=...) as stage:`
+    and set stage["rows_out"] inside the block. Using the same name again
+    (e.g. once per streamed chunk) adds to that stage's totals.
+    
+    Every stage records wall and CPU time, the process's peak RSS so far
+    at the end of the stage (process_peak_rss_mb, a running maximum over
+    the whole process) and how much the stage raised that peak
+    (rss_peak_growth_mb, 0 when the stage stayed below an earlier peak).
+    With trace_memory, Python allocations are also traced and each stage
+    records its own peak (tracing slows the run down, so it is off by
+    default).
+    
+    Parameters:
+    trace_memory (bool): Record per-stage peak traced memory with tracemalloc
+    """
+    
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = {}
+        self.stats = {}
+        self.info = {}
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._started_tracing = False
+        self._totals = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+    
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Measure one pipeline stage (see class docstring)."""
+        record = self.stages.setdefault(name, {
+            "name": name,
+            "calls": 0,
+            "wall_s": 0.0,
+            "cpu_s": 0.0,
+            "rows_in": None,
+            "rows_out": None,
+            "process_peak_rss_mb": None,
+            "rss_peak_growth_mb": None,
+            "peak_traced_mb": None,
+        })
+        current = {"rows_out": None}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        rss_before = process_peak_rss_mb()
+        try:
+            yield current
+        finally:
+            record["calls"] += 1
+            record["wall_s"] += time.perf_counter() - wall
+            record["cpu_s"] += time.process_time() - cpu
+            if rows_in is not None:
+                record["rows_in"] = (record["rows_in"] or 0) + rows_in
+            if current["rows_out"] is not None:
+                record["rows_out"] = (record["rows_out"] or 0) + current["rows_out"]
+            record["process_peak_rss_mb"] = process_peak_rss_mb()
+            if rss_before is not None:
+                growth = round(record["process_peak_rss_mb"] - rss_before, 1)
+                record["rss_peak_growth_mb"] = round((record["rss_peak_growth_mb"] or 0) + growth, 1)
+            if self.trace_memory:
+                traced = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+                record["peak_traced_mb"] = max(record["peak_traced_mb"] or 0, traced)
+    
+    def _current_totals(self):
+        return {
+            "wall_s": round(time.perf_counter() - self._start_wall, 4),
+            "cpu_s": round(time.process_time() - self._start_cpu, 4),
+            "process_peak_rss_mb": process_peak_rss_mb(),
+        }
+    
+    def finish(self):
+        """Freeze the run totals and stop memory tracing if this report started it."""
+        if self._totals is None:
+            self._totals = self._current_totals()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def to_dict(self):
+        """Return the report as plain JSON-serializable data."""
+        stages = []
+        for record in self.stages.values():
+            record = dict(record)
+            record["wall_s"] = round(record["wall_s"], 4)
+            record["cpu_s"] = round(record["cpu_s"], 4)
+            stages.append(record)
+        
+        return {
+            "started_at": self.started_at,
+            **self.info,
+            "totals": self._totals or self._current_totals(),
+            "stats": dict(self.stats),
+            "stages": stages,
+        }
+    
+    def save(self, path):
+        """Write the report as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
@@ -1,42 +1,53 @@
-from cleaner import (
-    clean_excel_pipeline, 
-    standardize_dates, 
-    clean_phone_numbers, 
-    remove_blank_rows,
-    format_excel_output
-)
-
 from config_loader import load_config
+from errors import (
+    ConfigError,
+    InputFileError,
+    ColumnMismatchError,
+    MissingColumnError,
+    OutputError,
+    PipelineError
+)
+from instrumentation import report_path
+from readers import is_csv
+import argparse
 import sys
 import os
-from datetime import datetime
 
-def _resolve_output_path(pattern: str) -> str:
-    """Resolve timestamp placeholders in output path and ensure directory exists.
+# pipeline (and with it pandas/openpyxl) is imported only when a run starts,
+# so --help, --validate and config errors return without that import cost
 
-    Supported tokens:
-      - {date} -> YYYYMMDD
-      - {time} -> HHMMSS
-      - {datehour} -> YYYYMMDD_HH
-      - {datetime} -> YYYYMMDD_HHMMSS
+def validate_only(config_file="config.json"):
+    """Dry run: check the config and input files without importing pandas.
+    
+    Returns:
+    bool: True if the config is valid and every input file exists
     """
-    now = datetime.now()
-    tokens = {
-        "{date}": now.strftime("%Y%m%d"),
-        "{time}": now.strftime("%H%M%S"),
-        "{datehour}": now.strftime("%Y%m%d_%H"),
-        "{datetime}": now.strftime("%Y%m%d_%H%M%S"),
-    }
-    resolved = pattern
-    for k, v in tokens.items():
-        resolved = resolved.replace(k, v)
-    # Ensure directory exists
-    out_dir = os.path.dirname(resolved)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
-    return resolved
+    print(f"Validating {config_file}...")
+    config = load_config(config_file)
+    print("✅ Configuration is valid")
+    
+    file_paths = config['files']['input_files']
+    missing = [fp for fp in file_paths if not os.path.exists(fp)]
+    for fp in file_paths:
+        print(f"    {'❌' if fp in missing else '✅'} {fp}")
+    
+    performance = config.get('performance', {})
+    if performance.get('streaming') and all(is_csv(fp) for fp in file_paths):
+        mode = "streaming"
+    elif performance.get('incremental'):
+        mode = "incremental"
+    else:
+        mode = "in-memory"
+    print(f"    - Output file: {config['files']['output_file']}")
+    print(f"    - Mode: {mode}")
+    
+    if missing:
+        print(f"❌ ERROR: {len(missing)} input file(s) not found")
+        return False
+    print("✅ Ready to run")
+    return True
 
-def run_pipeline():
+def run_pipeline(config_file="config.json"):
     """Main pipeline with error handling."""
     
     print("=" * 60)
@@ -45,132 +56,71 @@ def run_pipeline():
     print()
     
     #Load configuration 
-    print("Loading configuration from config.json...")
-    config = load_config()
+    print(f"Loading configuration from {config_file}...")
+    config = load_config(config_file)
     print("✅ Configuration loaded")
     print()
-    #Extract settings
-    file_paths = config['files']['input_files']
-    output_file = _resolve_output_path(config['files']['output_file'])
-    duplicate_column = config['cleaning_options']['duplicate_column']
-    keep_rule = config['cleaning_options'].get('keep_rule', 'first')
-    date_columns = config['cleaning_options'].get('date_columns', [])
-    phone_columns = config['cleaning_options'].get('phone_columns', [])
-    remove_blanks = config['cleaning_options'].get('remove_blank_rows', True)
-    do_formatting = config['cleaning_options'].get('format_excel', True)
-    
-    
-    print(f"Settings:")
-    print(f"    - Input files: {len(file_paths)} file(s)")
-    print(f"    - Output file: {output_file}") 
-    print(f"    - Duplicate check: {duplicate_column}")
-    print(f"    - Date columns: {date_columns if date_columns else 'None'}")
-    print(f"    - Phone columns: {phone_columns if phone_columns else 'None'}")
-    print(f"    - Remove blank rows: {remove_blanks}")
-    print(f"    - Format Excel output: {do_formatting}")
-    
     
     try:
-        #==== Step 1: Merge files ====#
-        print(f"Step 1: Merging {len(file_paths)} files...")
-        
-        try:
-            # First, just merge without deduplication
-            merged_df, summary = clean_excel_pipeline(
-                file_paths=file_paths,
-                subset_columns=[duplicate_column],
-                keep_rule="first"
-            )
-            print(f"✅ Merged {summary['files_merged']} files")
-            print(f"✅ Total rows: {summary['rows_before']}")
-            print()
-        except FileNotFoundError as e:
-            print(f"❌ ERROR: Could not find one or more files")
-            print(f"   Missing file: {e}")
-            print(f"   Check that these files exist:")
-            for fp in file_paths:
-                print(f"     - {fp}")
-            sys.exit(1)
-        except ValueError as e:
-            print(f"❌ ERROR: Column mismatch between files")
-            print(f"   {e}")
-            print(f"   Make sure all files have the same column structure")
-            sys.exit(1)
-        
-        #==== Step 2: Remove blank rows FIRST ====#
-        print("Step 2: Removing blank rows...")
-        merged_df, blanks_removed = remove_blank_rows(merged_df)
-        print(f"✅ Removed {blanks_removed} blank row(s)")
-        print()
-        
-        #==== Step 3: Remove duplicates ====#
-        print("Step 3: Removing duplicates...")
-        rows_before_dedup = len(merged_df)
-        merged_df = merged_df.drop_duplicates(subset=[duplicate_column], keep="first")
-        duplicates_removed = rows_before_dedup - len(merged_df)
-        print(f"✅ Duplicates removed: {duplicates_removed}")
-        print(f"✅ Final rows: {len(merged_df)}")
-        print()
-        
-        #==== Step 4: Standardize dates ====#
-        print("Step 4: Standardizing date columns...")
-        try:
-            merged_df, dates_fixed = standardize_dates(merged_df, date_columns=date_columns)
-            print(f"✅ Standardized {dates_fixed} date(s) to YYYY-MM-DD")
-        except ValueError as e:
-            print(f"⚠️  Date standardization skipped: {e}")
-            print(f"   Available columns: {list(merged_df.columns)}")
-        print()
-        
-        #==== Step 5: Clean phone numbers ====#
-        print("Step 5: Cleaning phone numbers...")
-        try:
-            merged_df, phone_fixed = clean_phone_numbers(merged_df, phone_columns=phone_columns)
-            print(f"✅ Cleaned {phone_fixed} phone number(s)")
-        except ValueError as e:
-            print(f"⚠️  Phone cleaning skipped: {e}")
-            print(f"   Available columns: {list(merged_df.columns)}")
-        print()
-        
-        #==== Step 6: Save file ====#
-        print(f"Step 6: Saving to {output_file}...")
-        try:
-            merged_df.to_excel(output_file, index=False)
-            print("✅ File saved successfully")
-        except PermissionError:
-            print(f"❌ ERROR: Cannot write to {output_file}")
-            print(f"   The file may be open in Excel - close it and try again")
-            sys.exit(1)
-        except Exception as e:
-            print(f"❌ ERROR: Could not save file")
-            print(f"   {e}")
-            sys.exit(1)
-        print()
-        
-        #==== Step 7: Format Excel ====#
-        print("Step 7: Formatting Excel output...")
-        try:
-            format_excel_output(output_file)
-            print("✅ Applied formatting (bold headers, auto-width)")
-        except Exception as e:
-            print(f"⚠️  Formatting failed (file still usable): {e}")
-        print()
+        from pipeline import run_pipeline as run_pipeline_config
+        result = run_pipeline_config(config, log=print)
         
         #==== Success! ====#
+        stats = result.stats
         print("=" * 60)
         print("✅ PIPELINE COMPLETED SUCCESSFULLY")
         print("=" * 60)
         print(f"📊 Final Statistics:")
-        print(f"   Total rows processed: {summary['rows_before']}")
-        print(f"   Blank rows removed: {blanks_removed}")
-        print(f"   Duplicates removed: {duplicates_removed if 'duplicates_removed' in locals() else 0}")
-        print(f"   Dates standardized: {dates_fixed if 'dates_fixed' in locals() else 0}")
-        print(f"   Phones cleaned: {phone_fixed if 'phone_fixed' in locals() else 0}")
-        print(f"   Final row count: {len(merged_df)}")
+        print(f"   Total rows processed: {stats['rows_before']}")
+        print(f"   Blank rows removed: {stats['blanks_removed']}")
+        print(f"   Duplicates removed: {stats['duplicates_removed']}")
+        if 'candidate_pairs' in stats:
+            print(f"   Fuzzy candidate pairs: {stats['candidate_pairs']} ({stats['fuzzy_pairs']} matched)")
+        print(f"   Dates standardized: {stats['dates_fixed']}")
+        print(f"   Phones cleaned: {stats['phone_fixed']}")
+        if stats.get('rows_saved'):
+            saved = ", ".join(f"{stage} {rows}" for stage, rows in stats['rows_saved'].items())
+            print(f"   Rows not cleaned (deduplicated first): {saved}")
+        if 'memo_hit_rate' in stats:
+            print(f"   Memo cache hit rate: {stats['memo_hit_rate']:.1%}")
+        print(f"   Final row count: {stats['final_rows']}")
         print()
-        print(f"📂 Output: {output_file}")
+        print(f"📂 Output: {result.output_file}")
+        if os.path.exists(report_path(result.output_file)):
+            print(f"📈 Run report: {report_path(result.output_file)}")
+        for warning in result.warnings:
+            if warning.startswith("Could not write run report"):
+                print(f"⚠️  {warning}")
         print()
-        
+        return result
+    
+    except ConfigError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    except InputFileError as e:
+        print(f"❌ ERROR: Could not find one or more files")
+        print(f"   Missing file: {e}")
+        print(f"   Check that these files exist:")
+        for fp in config['files']['input_files']:
+            print(f"     - {fp}")
+        sys.exit(1)
+    except ColumnMismatchError as e:
+        print(f"❌ ERROR: Column mismatch between files")
+        print(f"   {e}")
+        print(f"   Make sure all files have the same column structure")
+        sys.exit(1)
+    except MissingColumnError as e:
+        print(f"❌ ERROR: {e}")
+        if config['cleaning_options'].get('keep_columns'):
+            print(f"   Check keep_columns and the duplicate/date/phone columns in {config_file}")
+        sys.exit(1)
+    except OutputError as e:
+        print(f"❌ ERROR: {e}")
+        print(f"   Close the file if it is open in Excel and try again")
+        sys.exit(1)
+    except PipelineError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⚠️  Process interrupted by user")
         print("   No files were modified")
@@ -187,5 +137,16 @@ def run_pipeline():
         print(f"  - Error message: {e}")
         sys.exit(1)
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge, deduplicate and clean Excel/CSV files.")
+    parser.add_argument("--config", default="config.json", help="Config file (default: config.json)")
+    parser.add_argument("--validate", "--dry-run", action="store_true",
+                        help="Check the config and input files without running the pipeline")
+    args = parser.parse_args(argv)
+    
+    if args.validate:
+        sys.exit(0 if validate_only(args.config) else 1)
+    run_pipeline(args.config)
+
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    main()
@@ -0,0 +1,695 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from cleaner import (
+    clean_excel_pipeline,
+    remove_duplicates,
+    standardize_dates,
+    clean_phone_numbers,
+    remove_blank_rows,
+    DateFormatCache,
+    ValueCache,
+    infer_column_date_formats,
+    check_columns
+)
+from compaction import compact_dtypes, CATEGORY_MAX_RATIO
+from config_loader import validate_config
+# The exceptions are re-exported so callers only need `from pipeline import ...`
+from errors import (
+    PipelineError,
+    ConfigError,
+    InputFileError,
+    ColumnMismatchError,
+    MissingColumnError,
+    OutputError
+)
+from streaming import stream_csv_pipeline
+from executor import BlockPlan, run_fused
+from planner import StagePlan, DEDUP_KEY_COLUMN
+from fuzzy import remove_fuzzy_duplicates, FUZZY_MAX_DISTANCE, FUZZY_WINDOW
+from parallel import run_sharded
+from readers import resolve_excel_engine, is_csv
+from writers import write_output, output_format, compute_column_widths
+from instrumentation import RunReport, report_path
+from incremental import IncrementalCache, clean_single_file, load_cleaned_files, RAW_KEY_COLUMN
+
+
+def resolve_output_path(pattern: str) -> str:
+    """Resolve timestamp placeholders in output path and ensure directory exists.
+    
+    Supported tokens:
+      - {date} -> YYYYMMDD
+      - {time} -> HHMMSS
+      - {datehour} -> YYYYMMDD_HH
+      - {datetime} -> YYYYMMDD_HHMMSS
+    """
+    now = datetime.now()
+    tokens = {
+        "{date}": now.strftime("%Y%m%d"),
+        "{time}": now.strftime("%H%M%S"),
+        "{datehour}": now.strftime("%Y%m%d_%H"),
+        "{datetime}": now.strftime("%Y%m%d_%H%M%S"),
+    }
+    resolved = pattern
+    for k, v in tokens.items():
+        resolved = resolved.replace(k, v)
+    # Ensure directory exists
+    out_dir = os.path.dirname(resolved)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    return resolved
+
+
+def _no_log(*args, **kwargs):
+    pass
+
+
+class PipelineResult:
+    """
+    Outcome of one run_pipeline() call.
+    
+    Attributes:
+    df (pd.DataFrame or None): Cleaned data (None for streaming runs, which
+        write chunks straight to the output file)
+    stats (dict): files_merged, rows_before, blanks_removed, duplicates_removed,
+        dates_fixed, phone_fixed, final_rows (and memo_hit_rate with memoize_values)
+    output_file (str): Path the output was written to
+    report (RunReport): Per-stage timings, memory and row counts
+    warnings (list): Non-fatal problems, e.g. a skipped date or phone step
+    """
+    
+    def __init__(self, df, stats, output_file, report, warnings):
+        self.df = df
+        self.stats = stats
+        self.output_file = output_file
+        self.report = report
+        self.warnings = warnings
+    
+    def __repr__(self):
+        return f"PipelineResult(output_file={self.output_file!r}, final_rows={self.stats.get('final_rows')})"
+
+
+def _run_streaming_steps(file_paths, output_file, duplicate_column, date_columns, phone_columns,
+                         chunk_size, date_options, value_cache, keep_rule, verify_keys, do_formatting,
+                         read_columns, normalize_key, key_normalizers, report, log):
+    """Run the cleaning steps chunk by chunk over CSV inputs."""
+    log(f"Steps 1-6: Streaming {len(file_paths)} CSV file(s) in chunks of {chunk_size} rows...")
+    
+    try:
+        summary = stream_csv_pipeline(
+            file_paths,
+            output_file,
+            duplicate_column,
+            date_columns,
+            phone_columns,
+            chunk_size=chunk_size,
+            date_options=date_options,
+            value_cache=value_cache,
+            keep_rule=keep_rule,
+            verify_keys=verify_keys,
+            format_output=do_formatting,
+            columns=read_columns,
+            report=report,
+            normalize_key=normalize_key,
+            key_normalizers=key_normalizers
+        )
+    except FileNotFoundError as e:
+        raise InputFileError(str(e)) from e
+    except PermissionError as e:
+        raise OutputError(f"Cannot write to {output_file} - the file may be open in Excel") from e
+    except ImportError as e:
+        raise PipelineError(str(e)) from e
+    
+    log(f"✅ Processed {summary['chunks']} chunk(s) from {summary['files_merged']} files")
+    log(f"✅ Total rows: {summary['rows_before']}")
+    log(f"✅ Removed {summary['blanks_removed']} blank row(s)")
+    log(f"✅ Duplicates removed: {summary['duplicates_removed']}")
+    if summary['date_error']:
+        log(f"⚠️  Date standardization skipped: {summary['date_error']}")
+    else:
+        log(f"✅ Standardized {summary['dates_fixed']} date(s) to YYYY-MM-DD")
+    if summary['phone_error']:
+        log(f"⚠️  Phone cleaning skipped: {summary['phone_error']}")
+    else:
+        log(f"✅ Cleaned {summary['phone_fixed']} phone number(s)")
+    log(f"✅ Wrote {summary['rows_after']} rows to {output_file}")
+    if do_formatting and output_file.lower().endswith('.xlsx'):
+        log("✅ Applied formatting (bold headers, auto-width)")
+    log()
+    
+    return summary
+
+
+def _run_fused_steps(df, duplicate_column, keep_rule, date_columns, phone_columns, verify_keys,
+                     block_rows, date_options, value_cache, normalize_key, key_normalizers, report, log):
+    """
+    Steps 2-5 in one sweep: each row block is cleaned by every stage before the next.
+    
+    Returns:
+    tuple: (df, blanks_removed, duplicates_removed, dates_fixed, phone_fixed,
+    date_error, phone_error, rows_saved)
+    """
+    plan = BlockPlan(
+        duplicate_column, date_columns, phone_columns, keep_rule=keep_rule, verify_keys=verify_keys,
+        date_options=date_options, value_cache=value_cache, normalize_key=normalize_key,
+        key_normalizers=key_normalizers
+    )
+    log("Steps 2-5: Cleaning row blocks (blank rows, duplicates, dates, phones)...")
+    df, summary = run_fused(df, plan, block_rows=block_rows, report=report)
+    
+    log(f"✅ Processed {summary['blocks']} block(s) of {summary['block_rows']} rows")
+    log(f"✅ Removed {summary['blanks_removed']} blank row(s)")
+    log(f"✅ Duplicates removed: {summary['duplicates_removed']}")
+    log(f"✅ Final rows: {len(df)}")
+    if summary['date_error']:
+        log(f"⚠️  Date standardization skipped: {summary['date_error']}")
+    else:
+        log(f"✅ Standardized {summary['dates_fixed']} date(s) to YYYY-MM-DD")
+    if summary['phone_error']:
+        log(f"⚠️  Phone cleaning skipped: {summary['phone_error']}")
+    else:
+        log(f"✅ Cleaned {summary['phone_fixed']} phone number(s)")
+    log()
+    
+    return (df, summary['blanks_removed'], summary['duplicates_removed'], summary['dates_fixed'],
+            summary['phone_fixed'], summary['date_error'], summary['phone_error'], summary['rows_saved'])
+
+
+def _dedup_stage(df, key_column, keep_rule, key_normalizers, fuzzy_options, report):
+    """
+    Step 3: remove exact, normalized or (with fuzzy_options) near duplicates.
+    
+    Returns:
+    tuple: (df, duplicates_removed, fuzzy summary or None)
+    """
+    with report.stage("dedup", rows_in=len(df)) as stage:
+        if fuzzy_options is not None:
+            df, fuzzy_summary = remove_fuzzy_duplicates(
+                df, key_column, keep_rule=keep_rule, normalizers=key_normalizers, **fuzzy_options
+            )
+            duplicates_removed = fuzzy_summary["duplicates_removed"]
+        else:
+            df, duplicates_removed = remove_duplicates(
+                df, subset_columns=[key_column], keep_rule=keep_rule, key_normalizers=key_normalizers
+            )
+            fuzzy_summary = None
+        stage["rows_out"] = len(df)
+    return df, duplicates_removed, fuzzy_summary
+
+
+def _log_fuzzy_summary(fuzzy_summary, log):
+    """Log the candidate and matched pair counts of a fuzzy dedup stage."""
+    if fuzzy_summary is not None:
+        log(f"✅ Fuzzy matching: {fuzzy_summary['candidate_pairs']} candidate pair(s) of "
+            f"{fuzzy_summary['distinct_keys']} distinct keys scored, {fuzzy_summary['fuzzy_pairs']} matched")
+
+
+def _save_output(df, output_file, do_formatting, width_sample_rows, report, log):
+    """Write the cleaned DataFrame (Step 6) and return the number of rows saved."""
+    log(f"Step 6: Saving to {output_file}...")
+    try:
+        # Excel header style and column widths are applied while writing
+        column_widths = None
+        if do_formatting and output_format(output_file) == '.xlsx':
+            with report.stage("format", rows_in=len(df)) as stage:
+                column_widths = compute_column_widths(df, width_sample_rows)
+                stage["rows_out"] = len(df)
+        with report.stage("save", rows_in=len(df)) as stage:
+            write_output(df, output_file, format_output=do_formatting, column_widths=column_widths)
+            stage["rows_out"] = len(df)
+    except PermissionError as e:
+        raise OutputError(f"Cannot write to {output_file} - the file may be open in Excel") from e
+    except Exception as e:
+        raise OutputError(f"Could not save file: {e}") from e
+    log("✅ File saved successfully")
+    if do_formatting and output_file.lower().endswith('.xlsx'):
+        log("✅ Applied formatting (bold headers, auto-width)")
+    log()
+    return len(df)
+
+
+def _compact_stage(df, category_max_ratio, duplicate_column, report, log):
+    """Convert the frame (except the duplicate key) to compact dtypes and return (df, compaction summary)."""
+    log("Compacting column types...")
+    with report.stage("compact", rows_in=len(df)) as stage:
+        df, compaction = compact_dtypes(df, category_max_ratio=category_max_ratio,
+                                        skip_columns=[duplicate_column])
+        stage["rows_out"] = len(df)
+    log(f"✅ Memory: {compaction['memory_before_mb']} MB -> {compaction['memory_after_mb']} MB "
+        f"({len(compaction['category'])} category, {len(compaction['string'])} string, "
+        f"{len(compaction['downcast'])} downcast column(s))")
+    log()
+    return df, compaction
+
+
+def _run_incremental_steps(file_paths, cache, duplicate_column, keep_rule, date_columns, phone_columns,
+                           excel_engine, read_columns, date_options, value_cache, stage_plan, key_normalizers,
+                           fuzzy_options, report, log):
+    """
+    Steps 1-5 for incremental runs: clean changed files, load the rest from cache.
+    
+    Returns:
+    tuple: (merged_df, summary, blanks_removed, duplicates_removed, dates_fixed,
+    phone_fixed, date_error, phone_error, rows_saved)
+    """
+    log(f"Steps 1-2: Loading {len(file_paths)} file(s) (unchanged files come from the cache)...")
+    
+    # Anything that changes a file's cleaned frame must be part of the cache
+    # key (the cache adds CACHE_VERSION, bumped when the cleaning code changes)
+    format_cache = date_options["format_cache"]
+    sheet_name = 0  # the pipeline reads the first sheet of each workbook
+    settings = {
+        "duplicate_column": duplicate_column,
+        "date_columns": date_columns,
+        "phone_columns": phone_columns,
+        "columns": read_columns,
+        "excel_engine": excel_engine,
+        "sheet_name": sheet_name,
+        "infer_formats": date_options["infer_formats"],
+        "date_format_cache": format_cache.cache_file if format_cache else None,
+    }
+    
+    def clean_file(path):
+        # Formats are learned per file here, so they are cached with that file
+        options = dict(date_options, source=path)
+        return clean_single_file(
+            path, duplicate_column, date_columns, phone_columns, sheet_name=sheet_name,
+            excel_engine=excel_engine, columns=read_columns,
+            date_options=options, value_cache=value_cache
+        )
+    
+    try:
+        with report.stage("load") as stage:
+            results = load_cleaned_files(file_paths, cache, settings, clean_file)
+            stage["rows_out"] = sum(len(df) for df, _, _ in results)
+    except FileNotFoundError as e:
+        raise InputFileError(str(e)) from e
+    except ImportError as e:
+        raise PipelineError(str(e)) from e
+    
+    dfs = [df for df, _, _ in results]
+    stats = [file_stats for _, file_stats, _ in results]
+    for path, df in zip(file_paths[1:], dfs[1:]):
+        check_columns(path, df.columns, list(dfs[0].columns))
+    
+    merged_df = pd.concat(dfs, ignore_index=True)
+    summary = {"files_merged": len(file_paths), "rows_before": sum(s["rows_before"] for s in stats)}
+    blanks_removed = sum(s["blanks_removed"] for s in stats)
+    log(f"✅ Loaded {cache.hits} file(s) from cache, cleaned {cache.misses} changed file(s)")
+    log(f"✅ Total rows: {summary['rows_before']}")
+    log(f"✅ Removed {blanks_removed} blank row(s)")
+    log()
+    
+    #==== Step 3: Remove duplicates ====#
+    log("Step 3: Removing duplicates...")
+    # Deduplicate on the key as it was read, even if the column was cleaned,
+    # unless the plan normalizes the key (then unparseable keys stay as read)
+    key_column = RAW_KEY_COLUMN if RAW_KEY_COLUMN in merged_df.columns else duplicate_column
+    if stage_plan.key_stage and key_column == RAW_KEY_COLUMN:
+        merged_df = stage_plan.add_key_column(merged_df, merged_df[RAW_KEY_COLUMN])
+        key_column = stage_plan.dedup_column
+    merged_df, duplicates_removed, summary["fuzzy"] = _dedup_stage(
+        merged_df, key_column, keep_rule, key_normalizers, fuzzy_options, report
+    )
+    hidden_columns = [col for col in (RAW_KEY_COLUMN, DEDUP_KEY_COLUMN) if col in merged_df.columns]
+    if hidden_columns:
+        merged_df = merged_df.drop(columns=hidden_columns)
+    merged_df = merged_df.reset_index(drop=True)
+    _log_fuzzy_summary(summary["fuzzy"], log)
+    log(f"✅ Duplicates removed: {duplicates_removed}")
+    log(f"✅ Final rows: {len(merged_df)}")
+    log()
+    
+    #==== Steps 4-5: Counted on the kept rows, cleaned per file ====#
+    dates_fixed = 0
+    phone_fixed = 0
+    date_error = stats[0]["date_error"]
+    phone_error = stats[0]["phone_error"]
+    if date_error:
+        log(f"⚠️  Date standardization skipped: {date_error}")
+    else:
+        dates_fixed = int(sum((merged_df[col] != '').sum() for col in date_columns))
+        log(f"✅ Standardized {dates_fixed} date(s) to YYYY-MM-DD")
+    if phone_error:
+        log(f"⚠️  Phone cleaning skipped: {phone_error}")
+    else:
+        phone_fixed = int(sum((merged_df[col] != '').sum() for col in phone_columns))
+        log(f"✅ Cleaned {phone_fixed} phone number(s)")
+    log()
+    
+    # Files are cleaned one by one before the merged rows are deduplicated,
+    # so no stage skips the duplicate rows
+    rows_saved = stage_plan.rows_saved(0)
+    
+    return (merged_df, summary, blanks_removed, duplicates_removed, dates_fixed, phone_fixed,
+            date_error, phone_error, rows_saved)
+
+
+def run_pipeline(config, log=None):
+    """
+    Run the full cleaning pipeline for one configuration.
+    
+    Nothing is printed and the process is never exited, so one Python
+    process can run many jobs without paying the pandas/openpyxl import
+    cost again. Pass log=print to get the same progress output as main.py.
+    
+    Parameters:
+    config (dict): Same structure as config.json
+    log (callable or None): Called with each progress line (None = silent)
+    
+    Returns:
+    PipelineResult: Cleaned frame, statistics, output path and run report
+    
+    Raises:
+    ConfigError: Missing or invalid settings
+    InputFileError: An input file does not exist or cannot be read
+    ColumnMismatchError: Input files have different columns
+    MissingColumnError: The duplicate column (or a keep_columns entry) is not in the data
+    OutputError: The output file could not be written
+    PipelineError: Any other pipeline failure (e.g. pyarrow needed but missing)
+    """
+    log = log or _no_log
+    validate_config(config)
+    
+    #Extract settings
+    file_paths = config['files']['input_files']
+    duplicate_column = config['cleaning_options']['duplicate_column']
+    keep_rule = config['cleaning_options'].get('keep_rule', 'first')
+    date_columns = config['cleaning_options'].get('date_columns', [])
+    phone_columns = config['cleaning_options'].get('phone_columns', [])
+    remove_blanks = config['cleaning_options'].get('remove_blank_rows', True)
+    do_formatting = config['cleaning_options'].get('format_excel', True)
+    infer_date_formats = config['cleaning_options'].get('infer_date_formats', False)
+    date_format_cache = config['cleaning_options'].get('date_format_cache')
+    memoize_values = config['cleaning_options'].get('memoize_values', False)
+    memo_cache_size = config['cleaning_options'].get('memo_cache_size', 100000)
+    keep_columns = config['cleaning_options'].get('keep_columns')
+    normalize_key = config['cleaning_options'].get('normalize_duplicate_key', False)
+    key_normalizers = config['cleaning_options'].get('key_normalizers')
+    fuzzy_duplicates = config['cleaning_options'].get('fuzzy_duplicates', False)
+    fuzzy_block_column = config['cleaning_options'].get('fuzzy_block_column')
+    fuzzy_options = None
+    if fuzzy_duplicates:
+        fuzzy_options = {
+            "max_distance": config['cleaning_options'].get('fuzzy_max_distance', FUZZY_MAX_DISTANCE),
+            "window": config['cleaning_options'].get('fuzzy_window', FUZZY_WINDOW),
+            "block_column": fuzzy_block_column,
+        }
+    performance = config.get('performance', {})
+    streaming = performance.get('streaming', False)
+    chunk_size = performance.get('chunk_size', 100000)
+    verify_keys = performance.get('verify_duplicate_keys', False)
+    read_workers = performance.get('read_workers')
+    clean_workers = performance.get('clean_workers') or 1
+    shard_by = performance.get('shard_by', 'rows')
+    excel_engine = performance.get('excel_engine', 'auto')
+    width_sample_rows = performance.get('width_sample_rows')
+    incremental = performance.get('incremental', False)
+    cache_dir = performance.get('cache_dir', '.cache/data_cleaner')
+    cache_max_mb = performance.get('cache_max_mb', 500)
+    compact = performance.get('compact_dtypes', False)
+    category_max_ratio = performance.get('category_max_ratio', CATEGORY_MAX_RATIO)
+    fused = performance.get('fused', False)
+    block_rows = performance.get('block_rows')
+    
+    # Projection pushdown: only read the columns the pipeline needs
+    read_columns = None
+    if keep_columns:
+        read_columns = list(dict.fromkeys(
+            keep_columns + [duplicate_column] + date_columns + phone_columns
+            + ([fuzzy_block_column] if fuzzy_block_column else [])
+        ))
+    
+    # Dedup runs before the value cleaners; a cleaned key is normalized first
+    stage_plan = StagePlan(duplicate_column, date_columns, phone_columns, normalize_key=normalize_key)
+    resolved_engine = resolve_excel_engine(excel_engine, warn=False)
+    output_file = resolve_output_path(config['files']['output_file'])
+    
+    log(f"Settings:")
+    log(f"    - Input files: {len(file_paths)} file(s)")
+    log(f"    - Output file: {output_file}")
+    log(f"    - Duplicate check: {duplicate_column} (keep: {keep_rule})")
+    log(f"    - Key normalizers: {key_normalizers if key_normalizers else 'None'}")
+    log(f"    - Fuzzy duplicates: {fuzzy_options if fuzzy_options else False}")
+    log(f"    - Date columns: {date_columns if date_columns else 'None'}")
+    log(f"    - Infer date formats: {infer_date_formats}")
+    log(f"    - Phone columns: {phone_columns if phone_columns else 'None'}")
+    log(f"    - Remove blank rows: {remove_blanks}")
+    log(f"    - Stage order: {' -> '.join(stage_plan.stages)}")
+    log(f"    - Memoize cleaned values: {memoize_values}")
+    log(f"    - Format Excel output: {do_formatting}")
+    log(f"    - Columns read: {read_columns if read_columns else 'All'}")
+    log(f"    - Excel reader: {resolved_engine}")
+    log(f"    - Parallel file reading: {f'{read_workers} processes' if read_workers else False}")
+    log(f"    - Parallel cleaning: {f'{clean_workers} processes, sharded by {shard_by}' if clean_workers > 1 else False}")
+    log(f"    - Streaming (CSV only): {f'{chunk_size} rows per chunk' if streaming else False}")
+    log(f"    - Incremental (cache): {cache_dir if incremental else False}")
+    log(f"    - Compact dtypes: {compact}")
+    log(f"    - Fused block executor: {(f'{block_rows} rows per block' if block_rows else 'auto block size') if fused else False}")
+    
+    report = RunReport(trace_memory=performance.get('trace_memory', False))
+    report.info = {"input_files": file_paths, "output_file": output_file}
+    warnings = []
+    
+    
+    # One cache for every column and file in this run
+    value_cache = ValueCache(memo_cache_size) if memoize_values else None
+    
+    # Learned date formats are shared by every chunk and saved at the end
+    format_cache = DateFormatCache(date_format_cache) if infer_date_formats else None
+    date_options = {
+        "infer_formats": infer_date_formats,
+        "format_cache": format_cache,
+        # Formats are kept per input file, so changing the file list still reuses them
+        "source": list(file_paths),
+    }
+    
+    if excel_engine == 'calamine' and resolved_engine != 'calamine':
+        warnings.append("python-calamine is not installed - reading Excel files with openpyxl")
+        log("⚠️  python-calamine is not installed - reading Excel files with openpyxl")
+        log("   Install it with: pip install python-calamine")
+        log()
+    
+    use_streaming = streaming and all(is_csv(fp) for fp in file_paths) and not fuzzy_duplicates
+    if streaming and fuzzy_duplicates:
+        warnings.append("Fuzzy duplicate detection compares every key - loaded files into memory instead of streaming")
+        log("⚠️  Fuzzy duplicate detection compares every key - loading files into memory instead of streaming")
+        log()
+    elif streaming and not use_streaming:
+        warnings.append("Streaming only supports CSV inputs - loaded files into memory instead")
+        log("⚠️  Streaming only supports CSV inputs - loading files into memory instead")
+        log()
+    if compact and use_streaming:
+        warnings.append("compact_dtypes does not apply to streaming runs")
+        log("⚠️  compact_dtypes does not apply to streaming runs - chunks are already small")
+        log()
+    if incremental and use_streaming:
+        warnings.append("Incremental mode does not apply to streaming runs")
+        log("⚠️  Incremental mode does not apply to streaming runs - every chunk is processed")
+        log()
+    
+    # Format inference, sharding and fuzzy matching look at the whole column at once
+    use_fused = (fused and not use_streaming and not incremental and not infer_date_formats and clean_workers == 1
+                 and not fuzzy_duplicates)
+    if fused and not use_streaming and not incremental and not use_fused:
+        warnings.append("The fused executor does not support infer_date_formats, clean_workers or "
+                        "fuzzy_duplicates - ran stage by stage")
+        log("⚠️  The fused executor does not support infer_date_formats, clean_workers or fuzzy_duplicates "
+            "- running stage by stage")
+        log()
+    
+    merged_df = None
+    compaction = None
+    rows_saved = None
+    if use_streaming:
+        #==== Steps 1-6: Stream chunks through the pipeline ====#
+        summary = _run_streaming_steps(
+            file_paths, output_file, duplicate_column, date_columns, phone_columns,
+            chunk_size, date_options, value_cache, keep_rule, verify_keys, do_formatting,
+            read_columns, normalize_key, key_normalizers, report, log
+        )
+        blanks_removed = summary['blanks_removed']
+        duplicates_removed = summary['duplicates_removed']
+        dates_fixed = summary['dates_fixed']
+        phone_fixed = summary['phone_fixed']
+        date_error = summary['date_error']
+        phone_error = summary['phone_error']
+        final_rows = summary['rows_after']
+        rows_saved = summary['rows_saved']
+    elif incremental:
+        #==== Steps 1-5: Reuse cleaned frames of unchanged files ====#
+        cache = IncrementalCache(cache_dir, cache_max_mb)
+        (merged_df, summary, blanks_removed, duplicates_removed,
+         dates_fixed, phone_fixed, date_error, phone_error, rows_saved) = _run_incremental_steps(
+            file_paths, cache, duplicate_column, keep_rule, date_columns, phone_columns,
+            resolved_engine, read_columns, date_options, value_cache, stage_plan, key_normalizers,
+            fuzzy_options, report, log
+        )
+        if compact:
+            merged_df, compaction = _compact_stage(merged_df, category_max_ratio, duplicate_column, report, log)
+        
+        #==== Step 6: Save file ====#
+        final_rows = _save_output(merged_df, output_file, do_formatting, width_sample_rows, report, log)
+    else:
+        #==== Step 1: Merge files ====#
+        log(f"Step 1: Merging {len(file_paths)} files...")
+        try:
+            # First, just merge without deduplication
+            with report.stage("merge") as stage:
+                merged_df, summary = clean_excel_pipeline(
+                    file_paths=file_paths,
+                    subset_columns=[duplicate_column],
+                    keep_rule="first",
+                    workers=read_workers,
+                    excel_engine=resolved_engine,
+                    columns=read_columns
+                )
+                stage["rows_out"] = len(merged_df)
+        except FileNotFoundError as e:
+            raise InputFileError(str(e)) from e
+        except ImportError as e:
+            raise PipelineError(str(e)) from e
+        log(f"✅ Merged {summary['files_merged']} files")
+        log(f"✅ Total rows: {summary['rows_before']}")
+        log()
+        
+        if compact:
+            merged_df, compaction = _compact_stage(merged_df, category_max_ratio, duplicate_column, report, log)
+        
+        # merged_df belongs to this run, so the cleaning stages change it in
+        # place instead of each making a full copy
+        if use_fused:
+            #==== Steps 2-5: One sweep of row blocks ====#
+            (merged_df, blanks_removed, duplicates_removed, dates_fixed,
+             phone_fixed, date_error, phone_error, rows_saved) = _run_fused_steps(
+                merged_df, duplicate_column, keep_rule, date_columns, phone_columns, verify_keys,
+                block_rows, date_options, value_cache, normalize_key, key_normalizers, report, log
+            )
+        else:
+            #==== Step 2: Remove blank rows FIRST ====#
+            log("Step 2: Removing blank rows...")
+            with report.stage("blank_rows", rows_in=len(merged_df)) as stage:
+                merged_df, blanks_removed = remove_blank_rows(merged_df, inplace=True)
+                stage["rows_out"] = len(merged_df)
+            log(f"✅ Removed {blanks_removed} blank row(s)")
+            log()
+            
+            #==== Step 3: Remove duplicates ====#
+            if stage_plan.key_stage:
+                log(f"Step 3: Normalizing {duplicate_column} and removing duplicates...")
+                with report.stage(f"key_{stage_plan.key_stage}", rows_in=len(merged_df)) as stage:
+                    merged_df, _ = stage_plan.normalize_key(merged_df, value_cache, date_options)
+                    stage["rows_out"] = len(merged_df)
+            else:
+                log("Step 3: Removing duplicates...")
+            merged_df, duplicates_removed, summary["fuzzy"] = _dedup_stage(
+                merged_df, stage_plan.dedup_column, keep_rule, key_normalizers, fuzzy_options, report
+            )
+            merged_df = stage_plan.drop_key(merged_df)
+            _log_fuzzy_summary(summary["fuzzy"], log)
+            log(f"✅ Duplicates removed: {duplicates_removed}")
+            log(f"✅ Final rows: {len(merged_df)}")
+            log()
+            
+            #==== Step 4: Standardize dates ====#
+            log("Step 4: Standardizing date columns...")
+            stage_columns = stage_plan.columns("dates")
+            dates_fixed = stage_plan.key_fixed(merged_df, "dates")
+            date_error = None
+            try:
+                if not stage_plan.skips("dates"):
+                    with report.stage("dates", rows_in=len(merged_df)) as stage:
+                        if clean_workers > 1:
+                            # Formats are learned once here, workers only apply them
+                            sharded_options = {}
+                            if infer_date_formats and stage_columns:
+                                sharded_options["column_formats"] = infer_column_date_formats(
+                                    merged_df, stage_columns, format_cache, date_options["source"]
+                                )
+                            merged_df, fixed = run_sharded(
+                                standardize_dates, merged_df, stage_columns, clean_workers, shard_by,
+                                **sharded_options
+                            )
+                        else:
+                            merged_df, fixed = standardize_dates(
+                                merged_df,
+                                date_columns=stage_columns,
+                                value_cache=value_cache,
+                                inplace=True,
+                                **date_options
+                            )
+                        stage["rows_out"] = len(merged_df)
+                    dates_fixed += fixed
+                log(f"✅ Standardized {dates_fixed} date(s) to YYYY-MM-DD")
+            except ValueError as e:
+                date_error = str(e)
+                log(f"⚠️  Date standardization skipped: {e}")
+                log(f"   Available columns: {list(merged_df.columns)}")
+            log()
+            
+            #==== Step 5: Clean phone numbers ====#
+            log("Step 5: Cleaning phone numbers...")
+            stage_columns = stage_plan.columns("phones")
+            phone_fixed = stage_plan.key_fixed(merged_df, "phones")
+            phone_error = None
+            try:
+                if not stage_plan.skips("phones"):
+                    with report.stage("phones", rows_in=len(merged_df)) as stage:
+                        if clean_workers > 1:
+                            merged_df, fixed = run_sharded(
+                                clean_phone_numbers, merged_df, stage_columns, clean_workers, shard_by
+                            )
+                        else:
+                            merged_df, fixed = clean_phone_numbers(
+                                merged_df, phone_columns=stage_columns, value_cache=value_cache, inplace=True
+                            )
+                        stage["rows_out"] = len(merged_df)
+                    phone_fixed += fixed
+                log(f"✅ Cleaned {phone_fixed} phone number(s)")
+            except ValueError as e:
+                phone_error = str(e)
+                log(f"⚠️  Phone cleaning skipped: {e}")
+                log(f"   Available columns: {list(merged_df.columns)}")
+            log()
+            rows_saved = stage_plan.rows_saved(duplicates_removed)
+        
+        #==== Step 6: Save file ====#
+        final_rows = _save_output(merged_df, output_file, do_formatting, width_sample_rows, report, log)
+    
+    if date_error:
+        warnings.append(f"Date standardization skipped: {date_error}")
+    if phone_error:
+        warnings.append(f"Phone cleaning skipped: {phone_error}")
+    
+    if format_cache is not None:
+        format_cache.save()
+    
+    # Structured run report (per-stage time, memory and rows) next to the output
+    report.stats = {
+        "files_merged": summary['files_merged'],
+        "rows_before": summary['rows_before'],
+        "blanks_removed": blanks_removed,
+        "duplicates_removed": duplicates_removed,
+        "dates_fixed": int(dates_fixed),
+        "phone_fixed": int(phone_fixed),
+        "final_rows": final_rows,
+    }
+    if value_cache is not None:
+        report.stats["memo_hit_rate"] = value_cache.hit_rate
+    if rows_saved is not None:
+        report.stats["rows_saved"] = rows_saved
+    if summary.get("fuzzy"):
+        report.stats["candidate_pairs"] = summary["fuzzy"]["candidate_pairs"]
+        report.stats["fuzzy_pairs"] = summary["fuzzy"]["fuzzy_pairs"]
+    if compaction is not None:
+        report.stats["memory_before_mb"] = compaction["memory_before_mb"]
+        report.stats["memory_after_mb"] = compaction["memory_after_mb"]
+    report.finish()
+    try:
+        report.save(report_path(output_file))
+    except OSError as e:
+        warnings.append(f"Could not write run report: {e}")
+    
+    return PipelineResult(merged_df, dict(report.stats), output_file, report, warnings)
@@ -0,0 +1,110 @@
+from cleaner import standardize_dates, clean_phone_numbers
+
+
+# Hidden column the rows are deduplicated on when the key is normalized first
+DEDUP_KEY_COLUMN = "__dedup_key__"
+
+# Value cleaners that run after deduplication, in order
+CLEANING_STAGES = ("dates", "phones")
+
+
+class StagePlan:
+    """
+    Order of the cleaning stages for one run, decided from the config.
+    
+    Deduplication runs before the date and phone cleaners, so they only
+    clean the rows that are kept. When the duplicate column is itself a
+    date or phone column and normalize_key is set, only that column is
+    cleaned before deduplication (so '01/15/2024' and '2024-01-15' are the
+    same key) and the later stage skips it. Keys that cannot be normalized
+    are compared as they were read.
+    
+    Parameters:
+    duplicate_column (str): Column used to detect duplicates
+    date_columns (list): Date columns to standardize
+    phone_columns (list): Phone columns to clean
+    normalize_key (bool): Clean the duplicate column before deduplicating
+    """
+    
+    def __init__(self, duplicate_column, date_columns, phone_columns, normalize_key=False):
+        self.duplicate_column = duplicate_column
+        self.key_stage = None
+        if normalize_key and duplicate_column in date_columns:
+            self.key_stage = "dates"
+        elif normalize_key and duplicate_column in phone_columns:
+            self.key_stage = "phones"
+        
+        columns = {"dates": list(date_columns), "phones": list(phone_columns)}
+        if self.key_stage is not None:
+            columns[self.key_stage].remove(duplicate_column)
+        self._columns = columns
+    
+    @property
+    def dedup_column(self):
+        """Column the rows are deduplicated on."""
+        return DEDUP_KEY_COLUMN if self.key_stage else self.duplicate_column
+    
+    @property
+    def stages(self):
+        """Stage names in the order they run."""
+        order = ["blank_rows"]
+        if self.key_stage:
+            order.append(f"key_{self.key_stage}")
+        return order + ["dedup"] + list(CLEANING_STAGES)
+    
+    def columns(self, stage):
+        """Columns the 'dates' or 'phones' stage cleans after deduplication."""
+        return self._columns[stage]
+    
+    def skips(self, stage):
+        """True if the stage has nothing left to clean because its only column was the key."""
+        return stage == self.key_stage and not self._columns[stage]
+    
+    def normalize_key(self, df, value_cache=None, date_options=None):
+        """
+        Clean the duplicate column in place and add DEDUP_KEY_COLUMN.
+        
+        Returns:
+        tuple: (df, number of valid key values)
+        """
+        raw_key = df[self.duplicate_column]
+        if self.key_stage == "dates":
+            df, key_fixed = standardize_dates(
+                df, [self.duplicate_column], value_cache=value_cache, inplace=True, **(date_options or {})
+            )
+        else:
+            df, key_fixed = clean_phone_numbers(df, [self.duplicate_column], value_cache=value_cache, inplace=True)
+        
+        # The cleaners replace the column, so raw_key still holds the values as read
+        return self.add_key_column(df, raw_key), key_fixed
+    
+    def add_key_column(self, df, raw_key):
+        """
+        Add DEDUP_KEY_COLUMN (in place) from the already cleaned duplicate
+        column, using raw_key where a value could not be cleaned.
+        """
+        key = df[self.duplicate_column]
+        df.insert(len(df.columns), DEDUP_KEY_COLUMN, key.where(key != '', raw_key))
+        return df
+    
+    def drop_key(self, df):
+        """Remove DEDUP_KEY_COLUMN after deduplication (in place, without copying the frame)."""
+        if self.key_stage:
+            del df[DEDUP_KEY_COLUMN]
+        return df
+    
+    def key_fixed(self, df, stage):
+        """Valid normalized keys in df, counted with the stage that owns the key column."""
+        if stage != self.key_stage:
+            return 0
+        return int((df[self.duplicate_column] != '').sum())
+    
+    def rows_saved(self, duplicates_removed):
+        """Rows each cleaning stage did not have to clean because deduplication ran first."""
+        saved = {}
+        if self.key_stage:
+            saved[f"key_{self.key_stage}"] = 0
+        for stage in CLEANING_STAGES:
+            if self._columns[stage]:
+                saved[stage] = duplicates_removed
+        return saved
@@ -0,0 +1,173 @@
+import importlib.util
+import warnings
+from contextlib import contextmanager
+
+from errors import PipelineError, InputFileError, MissingColumnError
+
+# pandas and openpyxl are imported inside the readers, so the engine and
+# extension helpers below stay cheap to import (config validation uses them)
+
+
+# Engines accepted by read_file / performance.excel_engine
+#   auto     - calamine if installed, otherwise openpyxl
+#   calamine - Rust reader (pip install python-calamine), fastest
+#   openpyxl - pandas' default openpyxl reader (already opens workbooks read-only)
+EXCEL_ENGINES = ["auto", "calamine", "openpyxl"]
+
+# Input extensions read with pandas' CSV parser / with pyarrow
+CSV_EXTENSIONS = ('.csv', '.csv.gz')
+ARROW_EXTENSIONS = ('.parquet', '.feather', '.arrow', '.ipc')
+
+
+def is_csv(path):
+    """Return True for CSV inputs (plain or gzipped)."""
+    return path.lower().endswith(CSV_EXTENSIONS)
+
+
+def calamine_available():
+    """Return True if the python-calamine package is installed."""
+    return importlib.util.find_spec("python_calamine") is not None
+
+
+def resolve_excel_engine(engine="auto", warn=True):
+    """
+    Pick the Excel engine that will actually be used.
+    
+    'calamine' falls back to 'openpyxl' (with a warning) when
+    python-calamine is not installed.
+    
+    Parameters:
+    engine (str): One of EXCEL_ENGINES
+    warn (bool): Emit a warning when falling back
+    
+    Returns:
+    str: 'calamine' or 'openpyxl'
+    """
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"Invalid excel_engine '{engine}'. Allowed values: {EXCEL_ENGINES}")
+    
+    if engine in ("auto", "calamine"):
+        if calamine_available():
+            return "calamine"
+        if engine == "calamine" and warn:
+            warnings.warn("python-calamine is not installed - reading Excel files with openpyxl")
+        return "openpyxl"
+    return engine
+
+
+def read_excel_file(path, sheet_name=0, engine="auto", columns=None):
+    """
+    Read one sheet of an Excel file with the selected engine.
+    
+    Parameters:
+    path (str): .xlsx / .xlsm / .xls file
+    sheet_name (int or str): Sheet name or index
+    engine (str): One of EXCEL_ENGINES
+    columns (list or None): Only keep these columns (None = all)
+    
+    Returns:
+    pd.DataFrame: Sheet contents
+    """
+    import pandas as pd
+    
+    engine = resolve_excel_engine(engine)
+    usecols = None if columns is None else (lambda name: name in columns)
+    
+    if engine == "calamine":
+        return pd.read_excel(path, sheet_name=sheet_name, engine="calamine", usecols=usecols)
+    return pd.read_excel(path, sheet_name=sheet_name, usecols=usecols)
+
+
+def _read_arrow_file(path, columns=None):
+    """
+    Read a Parquet, Feather or Arrow IPC file with pyarrow.
+    
+    Only the requested columns are read from disk (projection pushdown).
+    """
+    try:
+        import pyarrow
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(f"Reading {path} needs pyarrow - install it with: pip install pyarrow")
+    
+    if path.lower().endswith('.parquet'):
+        names = pq.read_schema(path).names
+        read_columns = None if columns is None else [name for name in names if name in columns]
+        table = pq.read_table(path, columns=read_columns)
+    else:
+        # Feather v2 is the Arrow IPC file format; fall back to the stream format
+        try:
+            with pyarrow.ipc.open_file(path) as reader:
+                names = reader.schema.names
+        except pyarrow.ArrowInvalid:
+            with pyarrow.ipc.open_stream(path) as reader:
+                table = reader.read_all()
+            names = table.schema.names
+            if columns is not None:
+                table = table.select([name for name in names if name in columns])
+        else:
+            read_columns = None if columns is None else [name for name in names if name in columns]
+            table = feather.read_table(path, columns=read_columns)
+    
+    return table.to_pandas()
+
+
+@contextmanager
+def reading(path):
+    """
+    Raise a failure to read path (corrupt or unsupported content) as InputFileError.
+    
+    Missing files and missing optional packages keep their own errors.
+    """
+    try:
+        yield
+    except (FileNotFoundError, ImportError, PipelineError):
+        raise
+    except Exception as e:
+        raise InputFileError(f"Could not read {path}: {e}") from e
+
+
+def read_file(path, sheet_name=0, engine="auto", columns=None):
+    """
+    Read one input file based on its extension.
+    
+    Supports Excel (.xlsx/.xlsm/.xls), CSV (.csv/.csv.gz), and Parquet,
+    Feather and Arrow IPC (.parquet/.feather/.arrow/.ipc, need pyarrow).
+    
+    With columns, only those columns are read (in file order). CSV,
+    Parquet and Feather skip the other columns while parsing, which is
+    where the large savings are on wide exports.
+    
+    Parameters:
+    path (str): Input file
+    sheet_name (int or str): Sheet name or index (Excel only)
+    engine (str): Excel engine, one of EXCEL_ENGINES
+    columns (list or None): Columns to read (None = all)
+    
+    Returns:
+    pd.DataFrame: File contents
+    
+    Raises:
+    InputFileError: The file exists but cannot be parsed
+    MissingColumnError: A requested column is not in the file
+    """
+    import pandas as pd
+    
+    lower_path = path.lower()
+    if columns is not None:
+        columns = set(columns)
+    
+    with reading(path):
+        if is_csv(path):
+            df = pd.read_csv(path, usecols=None if columns is None else (lambda name: name in columns))
+        elif lower_path.endswith(ARROW_EXTENSIONS):
+            df = _read_arrow_file(path, columns=columns)
+        else:
+            df = read_excel_file(path, sheet_name=sheet_name, engine=engine, columns=columns)
+    
+    if columns is not None:
+        missing = sorted(columns - set(df.columns))
+        if missing:
+            raise MissingColumnError(f"Column(s) {missing} not found in {path}")
+    return df
@@ -0,0 +1,123 @@
+import pandas as pd
+
+from errors import ColumnMismatchError, MissingColumnError
+from readers import reading
+from executor import BlockPlan
+from writers import open_chunk_writer
+from instrumentation import RunReport
+
+
+def iter_csv_chunks(file_paths, chunk_size, columns=None):
+    """
+    Read CSV files in chunks, checking that all files share the same columns.
+    
+    Parameters:
+    file_paths (list): CSV files to read, in order
+    chunk_size (int): Rows per chunk
+    columns (list or None): Only read these columns (None = all)
+    
+    Yields:
+    pd.DataFrame: Next chunk of rows
+    """
+    first_columns = None
+    columns = None if columns is None else set(columns)
+    usecols = None if columns is None else (lambda name: name in columns)
+    
+    for i, path in enumerate(file_paths):
+        # Parse errors surface while iterating, so each chunk is read under reading()
+        with reading(path):
+            reader = iter(pd.read_csv(path, chunksize=chunk_size, usecols=usecols))
+        j = 0
+        while True:
+            with reading(path):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            if j == 0:
+                if columns is not None and not columns.issubset(chunk.columns):
+                    raise MissingColumnError(f"Column(s) {sorted(columns - set(chunk.columns))} not found in {path}")
+                
+                #Check column consistency
+                if i == 0:
+                    first_columns = list(chunk.columns)
+                elif list(chunk.columns) != first_columns:
+                    raise ColumnMismatchError(
+                        f"Column mismatch: {path} has different columns than first file.\n"
+                        f"Expected: {first_columns}\n"
+                        f"Got: {list(chunk.columns)}"
+                    )
+            j += 1
+            yield chunk
+
+
+def stream_csv_pipeline(file_paths, output_file, duplicate_column, date_columns, phone_columns,
+                        chunk_size=100_000, date_options=None, value_cache=None,
+                        keep_rule="first", verify_keys=False, format_output=False, columns=None,
+                        report=None, normalize_key=False, key_normalizers=None):
+    """
+    Clean CSV inputs chunk by chunk and write the output incrementally.
+    
+    Each chunk goes through blank-row removal, deduplication (with a
+    compact index of key hashes carried across chunks and files), date and
+    phone cleaning, and is then appended to the output file. keep_rule
+    'last' or False needs a first pass over the inputs to count keys, so
+    the files are read twice.
+    
+    Parameters:
+    file_paths (list): CSV files to process, in order
+    output_file (str): Output path (.csv or .xlsx)
+    duplicate_column (str): Column used to detect duplicates
+    date_columns (list): Date columns to standardize
+    phone_columns (list): Phone columns to clean
+    chunk_size (int): Rows per chunk
+    date_options (dict or None): Extra keyword arguments for standardize_dates
+    value_cache (ValueCache or None): Memoization cache for dates/phones
+    keep_rule (str or False): 'first', 'last', or False
+    verify_keys (bool): Confirm hash matches against stored keys (keep 'first')
+    format_output (bool): Bold header and column widths (sized from the first chunk) for .xlsx output
+    columns (list or None): Only read these columns from the inputs
+    report (RunReport or None): Collects per-stage timings (summed over chunks)
+    normalize_key (bool): Clean the duplicate column before deduplicating (see planner.py)
+    key_normalizers (list or None): Compare keys after these dedup.KEY_NORMALIZERS
+    
+    Returns:
+    dict: Summary with row counts per stage
+    """
+    # Stages repeat once per chunk and add up in the report
+    report = report if report is not None else RunReport()
+    
+    plan = BlockPlan(
+        duplicate_column, date_columns, phone_columns, keep_rule=keep_rule, verify_keys=verify_keys,
+        date_options=date_options, value_cache=value_cache, normalize_key=normalize_key,
+        key_normalizers=key_normalizers
+    )
+    if plan.needs_observation:
+        # First pass: count keys so later occurrences can be recognized
+        with report.stage("dedup_observe"):
+            for chunk in iter_csv_chunks(file_paths, chunk_size, columns):
+                plan.observe(chunk)
+    
+    writer = open_chunk_writer(output_file, format_output=format_output)
+    chunks = iter_csv_chunks(file_paths, chunk_size, columns)
+    
+    try:
+        while True:
+            with report.stage("merge") as stage:
+                chunk = next(chunks, None)
+                stage["rows_out"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                break
+            
+            chunk = plan.run_block(chunk, report)
+            
+            with report.stage("save", rows_in=len(chunk)) as stage:
+                writer.write(chunk)
+                stage["rows_out"] = len(chunk)
+    finally:
+        with report.stage("save"):
+            writer.close()
+    
+    summary = plan.summary()
+    summary["files_merged"] = len(file_paths)
+    summary["chunks"] = summary.pop("blocks")
+    return summary
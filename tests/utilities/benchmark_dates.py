@@ -0,0 +1,102 @@
+import pandas as pd
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from cleaner import standardize_dates
+
+# Usage: python3 tests/utilities/benchmark_dates.py [rows]
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+
+def legacy_parse_date(date_str):
+    """Per-cell parser used by standardize_dates before the vectorized engine."""
+    if pd.isna(date_str):
+        return pd.NaT
+    
+    formats = [
+        '%m/%d/%Y',
+        '%Y-%m-%d',
+        '%B %d, %Y',
+        '%b %d, %Y',
+        '%d/%m/%Y',
+        '%Y/%m/%d',
+    ]
+    
+    for fmt in formats:
+        try:
+            return pd.to_datetime(date_str, format=fmt)
+        except (ValueError, TypeError):
+            continue
+    
+    try:
+        return pd.to_datetime(date_str)
+    except:
+        return pd.NaT
+
+
+def legacy_standardize_dates(df, date_columns):
+    df_copy = df.copy()
+    conversion_count = 0
+    for col in date_columns:
+        df_copy[col] = df_copy[col].apply(legacy_parse_date)
+        conversion_count += df_copy[col].notna().sum()
+        df_copy[col] = df_copy[col].dt.strftime('%Y-%m-%d')
+        df_copy[col] = df_copy[col].fillna('')
+    return df_copy, conversion_count
+
+
+def make_dates(n):
+    """Mixed-format dates, roughly like a merged loyalty export."""
+    random.seed(42)
+    values = []
+    for _ in range(n):
+        d = pd.Timestamp("2020-01-01") + pd.Timedelta(days=random.randint(0, 1500))
+        style = random.random()
+        if style < 0.6:
+            values.append(d.strftime('%m/%d/%Y'))
+        elif style < 0.8:
+            values.append(d.strftime('%Y-%m-%d'))
+        elif style < 0.9:
+            values.append(d.strftime('%B %d, %Y'))
+        elif style < 0.95:
+            values.append(d.strftime('%Y/%m/%d'))
+        elif style < 0.98:
+            values.append(None)
+        else:
+            values.append("not a date")
+    return values
+
+
+print("=" * 60)
+print(f"DATE ENGINE BENCHMARK ({ROWS:,} rows)")
+print("=" * 60)
+
+df = pd.DataFrame({"JoinDate": make_dates(ROWS)})
+
+start = time.perf_counter()
+legacy_df, legacy_count = legacy_standardize_dates(df, ["JoinDate"])
+legacy_time = time.perf_counter() - start
+print(f"Per-cell path:   {legacy_time:8.2f}s  ({ROWS / legacy_time:,.0f} rows/sec)")
+
+start = time.perf_counter()
+new_df, new_count = standardize_dates(df, ["JoinDate"])
+new_time = time.perf_counter() - start
+print(f"Vectorized path: {new_time:8.2f}s  ({ROWS / new_time:,.0f} rows/sec)")
+
+assert legacy_count == new_count
+assert legacy_df["JoinDate"].equals(new_df["JoinDate"])
+
+print(f"Speedup: {legacy_time / new_time:.1f}x (outputs identical)")
+
+# Offset strings and tz-aware timestamps keep their local calendar date
+edge_df = pd.DataFrame({
+    "Offsets": ["2024-01-15T01:00:00+05:00", "2024-01-15T02:00:00+05:00", None],
+    "Aware": pd.Series(pd.to_datetime(["2024-01-15 01:00", "2024-03-01 23:30", None])).dt.tz_localize("Asia/Karachi"),
+})
+legacy_edge, legacy_count = legacy_standardize_dates(edge_df, ["Offsets", "Aware"])
+new_edge, new_count = standardize_dates(edge_df, ["Offsets", "Aware"])
+assert legacy_count == new_count
+assert legacy_edge.equals(new_edge)
+print("Edge cases (UTC offsets, tz-aware column): identical")
@@ -0,0 +1,63 @@
+import pandas as pd
+import glob
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from readers import read_excel_file, calamine_available
+
+# Usage: python3 tests/utilities/benchmark_readers.py [rows]
+# Every tests/test_data file is scaled up to about [rows] rows, then read with each engine.
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../test_data')
+ENGINES = ["openpyxl"] + (["calamine"] if calamine_available() else [])
+
+
+def scale_file(path, rows, out_dir):
+    """Repeat a test file's rows until it has about `rows` rows."""
+    df = pd.read_excel(path)
+    repeats = max(1, -(-rows // max(len(df), 1)))
+    big = pd.concat([df] * repeats, ignore_index=True).head(rows)
+    out_path = os.path.join(out_dir, os.path.basename(path))
+    big.to_excel(out_path, index=False)
+    return out_path, len(big)
+
+
+print("=" * 60)
+print(f"EXCEL READER BENCHMARK (~{ROWS:,} rows per file)")
+print("=" * 60)
+if not calamine_available():
+    print("(python-calamine not installed - skipping the calamine engine)")
+
+totals = {engine: 0.0 for engine in ENGINES}
+total_rows = 0
+
+with tempfile.TemporaryDirectory() as tmp:
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.xlsx'))):
+        scaled_path, rows = scale_file(path, ROWS, tmp)
+        total_rows += rows
+        print(f"\n{os.path.basename(path)} ({rows:,} rows)")
+        
+        reference = None
+        for engine in ENGINES:
+            start = time.perf_counter()
+            df = read_excel_file(scaled_path, engine=engine)
+            elapsed = time.perf_counter() - start
+            totals[engine] += elapsed
+            print(f"  {engine:<18} {elapsed:7.2f}s  ({rows / elapsed:,.0f} rows/sec)")
+            
+            # Every engine must return the same DataFrame as pandas' default reader
+            if reference is None:
+                reference = df
+            else:
+                pd.testing.assert_frame_equal(df, reference)
+
+print()
+print("=" * 60)
+print(f"TOTAL ({total_rows:,} rows)")
+for engine in ENGINES:
+    print(f"  {engine:<18} {totals[engine]:7.2f}s  ({total_rows / totals[engine]:,.0f} rows/sec, "
+          f"{totals['openpyxl'] / totals[engine]:.1f}x vs openpyxl)")
+print("All engines returned identical DataFrames")
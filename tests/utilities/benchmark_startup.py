@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Usage: python3 tests/utilities/benchmark_startup.py [runs]
+# Measures CLI startup with `python -X importtime`: the --validate dry run
+# (which must not import pandas) against importing the full pipeline.
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+
+def import_profile(args):
+    """
+    Run python -X importtime with args and parse its report.
+    
+    Returns:
+    tuple: (total import time in ms, set of imported module names, wall time in s)
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{args} failed:\n{proc.stdout}\n{proc.stderr}")
+    
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Top-level imports (no indentation) add up to the total
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules, wall
+
+
+def best_of(args, runs):
+    profiles = [import_profile(args) for _ in range(runs)]
+    return min(p[0] for p in profiles), profiles[0][1], min(p[2] for p in profiles)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print(f"CLI STARTUP BENCHMARK (best of {RUNS} runs)")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "files": {
+                    "input_files": ["tests/test_data/test1_small_sales.xlsx"],
+                    "output_file": os.path.join(tmp, "out.xlsx")
+                },
+                "cleaning_options": {"duplicate_column": "CustomerEmail"}
+            }, f)
+        
+        validate_ms, validate_modules, validate_wall = best_of(["main.py", "--validate", "--config", config_path], RUNS)
+        pipeline_ms, _, pipeline_wall = best_of(["-c", "import pipeline"], RUNS)
+    
+    print(f"  main.py --validate   imports {validate_ms:7.1f} ms   process {validate_wall * 1000:7.1f} ms")
+    print(f"  import pipeline      imports {pipeline_ms:7.1f} ms   process {pipeline_wall * 1000:7.1f} ms")
+    print(f"  Dry run imports are {pipeline_ms / validate_ms:.0f}x cheaper")
+    
+    heavy = sorted(name for name in validate_modules if name.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"--validate imported {heavy}"
+    print("✓ --validate imports none of: " + ", ".join(HEAVY_MODULES))
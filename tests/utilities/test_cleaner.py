@@ -1,8 +1,26 @@
 import pandas as pd
 import sys
 import os
+import tempfile
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
-from cleaner import remove_duplicates, merge_excel_files, clean_excel_pipeline, standardize_dates, clean_phone_numbers, remove_blank_rows
+from cleaner import format_excel_output, remove_duplicates, merge_excel_files, clean_excel_pipeline, standardize_dates, clean_phone_numbers, remove_blank_rows, infer_date_format, DateFormatCache, ValueCache, infer_column_date_formats
+from streaming import stream_csv_pipeline
+from dedup import StreamingDeduplicator, KeyIndex
+from readers import read_file, resolve_excel_engine, calamine_available
+from writers import write_excel, compute_column_widths, open_chunk_writer, write_output
+from openpyxl import load_workbook
+from incremental import IncrementalCache, clean_single_file, load_cleaned_files, MANIFEST_NAME
+from instrumentation import RunReport
+from pipeline import run_pipeline, ConfigError, InputFileError, ColumnMismatchError
+from batch import run_batch, collect_config_files
+from config_loader import validate_config
+from benchmark_startup import import_profile
+from compaction import compact_dtypes
+from parallel import run_sharded
+from executor import BlockPlan, run_fused
+from planner import StagePlan
+from fuzzy import remove_fuzzy_duplicates, bounded_edit_distance
+import json
 
 # Sample DataFrame
 data = {
@@ -101,5 +119,817 @@ cleaned_blanks, removed = remove_blank_rows(df_blanks)
 assert len(cleaned_blanks) == 2
 assert removed == 1
 
+#TEST 10: Vectorized date engine keeps format priority and blanks
 
-print("✓ All tests passed")
\ No newline at end of file
+df_mixed_dates = pd.DataFrame({
+    "JoinDate": ["01/02/2024", "15/01/2024", "Mar 10, 2024", None, "not a date", "2024/01/15"]
+})
+
+cleaned_mixed, count = standardize_dates(df_mixed_dates, date_columns=["JoinDate"])
+assert count == 4
+assert list(cleaned_mixed["JoinDate"]) == ["2024-01-02", "2024-01-15", "2024-03-10", "", "", "2024-01-15"]
+
+# UTC offsets and tz-aware timestamps keep their local calendar date
+df_zoned = pd.DataFrame({
+    "Offset": ["2024-01-15T01:00:00+05:00", "2024-01-15T23:00:00-05:00", "01/15/2024"],
+    "Aware": pd.Series(pd.to_datetime(["2024-01-15 01:00", "2024-03-01 23:30", None])).dt.tz_localize("Asia/Karachi"),
+    "Mixed": [pd.Timestamp("2024-01-15 01:00", tz="Asia/Karachi"), pd.Timestamp("2024-03-01 23:30", tz="US/Eastern"), "01/15/2024"],
+})
+cleaned_zoned, count = standardize_dates(df_zoned, date_columns=["Offset", "Aware", "Mixed"])
+assert count == 8
+assert list(cleaned_zoned["Offset"]) == ["2024-01-15", "2024-01-15", "2024-01-15"]
+assert list(cleaned_zoned["Aware"]) == ["2024-01-15", "2024-03-01", ""]
+assert list(cleaned_zoned["Mixed"]) == ["2024-01-15", "2024-03-01", "2024-01-15"]
+
+#TEST 11: Inferred date format is learned per (source, column)
+
+df_dmy = pd.DataFrame({"JoinDate": ["15/01/2024", "20/02/2024", "01/03/2024", "2024-04-05"]})
+assert infer_date_format(df_dmy["JoinDate"]) == "%d/%m/%Y"
+
+format_cache = DateFormatCache()
+cleaned_dmy, count = standardize_dates(
+    df_dmy, date_columns=["JoinDate"], infer_formats=True, format_cache=format_cache, source="feed.csv"
+)
+assert count == 4
+assert list(cleaned_dmy["JoinDate"]) == ["2024-01-15", "2024-02-20", "2024-03-01", "2024-04-05"]
+assert format_cache.get("feed.csv", "JoinDate") == "%d/%m/%Y"
+
+# The pipeline keys formats per input file, so adding a file to the run still
+# reuses the format learned for the others (ambiguous dates follow it)
+with tempfile.TemporaryDirectory() as tmp:
+    dmy_path, ambiguous_path = os.path.join(tmp, "dmy.csv"), os.path.join(tmp, "ambiguous.csv")
+    df_dmy.assign(Email=[f"{i}@x.com" for i in range(4)]).to_csv(dmy_path, index=False)
+    pd.DataFrame({"JoinDate": ["01/02/2024"] * 4, "Email": [f"{i}@y.com" for i in range(4)]}).to_csv(ambiguous_path, index=False)
+    config = {
+        "files": {"input_files": [dmy_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email", "date_columns": ["JoinDate"], "infer_date_formats": True,
+                             "date_format_cache": os.path.join(tmp, "formats.json")},
+    }
+    run_pipeline(config)
+    config["files"]["input_files"] = [dmy_path, ambiguous_path]
+    assert run_pipeline(config).df["JoinDate"].tolist()[4:] == ["2024-02-01"] * 4
+    assert DateFormatCache(config["cleaning_options"]["date_format_cache"]).get(ambiguous_path, "JoinDate") == "%d/%m/%Y"
+
+#TEST 12: Phone extensions, country codes and long numbers
+
+df_phone_rules = pd.DataFrame({
+    "Phone": ["555-123-4567x100", "+1-555-123-4567", "0015551234567", "555-1234", None, "555 123 4567 X 9", 5551234567]
+})
+
+cleaned_rules, count = clean_phone_numbers(df_phone_rules, phone_columns=["Phone"])
+assert count == 5
+assert list(cleaned_rules["Phone"]) == [
+    "(555) 123-4567", "(555) 123-4567", "(555) 123-4567", "", "", "(555) 123-4567", "(555) 123-4567"
+]
+
+#TEST 13: Memoized cleaning matches the direct path and reports hits
+
+value_cache = ValueCache(max_size=100)
+memo_phones, count = clean_phone_numbers(df_phone_rules, phone_columns=["Phone"], value_cache=value_cache)
+assert count == 5
+assert memo_phones["Phone"].equals(cleaned_rules["Phone"])
+
+memo_dates, count = standardize_dates(df_mixed_dates, date_columns=["JoinDate"], value_cache=value_cache)
+assert count == 4
+assert memo_dates["JoinDate"].equals(cleaned_mixed["JoinDate"])
+assert value_cache.hits == 0
+
+clean_phone_numbers(df_phone_rules, phone_columns=["Phone"], value_cache=value_cache)
+assert value_cache.hits == 6
+assert 0 < value_cache.hit_rate < 1
+
+#TEST 14: Blank detection covers whitespace and null tokens
+
+df_tokens = pd.DataFrame({
+    "Name": ["Alice", "   ", "NULL", "nan", ""],
+    "Email": ["", "\t", None, "n/a", None],
+    "Age": [25, None, None, None, 30]
+})
+
+cleaned_tokens, removed = remove_blank_rows(df_tokens)
+assert removed == 2
+assert list(cleaned_tokens.index) == [0, 1, 2]
+assert list(cleaned_tokens["Email"].fillna("")) == ["", "n/a", ""]
+assert cleaned_tokens["Name"].isna().tolist() == [False, True, True]
+
+# Object columns without any strings (bools from Excel, or a chunk holding only numbers)
+df_flags = pd.DataFrame({"Name": ["x", None, "y"], "Flag": [True, None, False]})
+cleaned_flags, removed = remove_blank_rows(df_flags)
+assert removed == 1 and cleaned_flags["Flag"].tolist() == [True, False]
+df_codes = pd.DataFrame({"Code": pd.Series([1, None, "  ", "A"], dtype=object), "Name": [None, None, None, "z"]})
+for start in range(0, len(df_codes), 2):
+    _, removed = remove_blank_rows(df_codes.iloc[start:start + 2])
+    assert removed == 1
+
+#TEST 15: Streaming CSV pipeline dedups across chunks and files
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    stream_inputs = []
+    for i in range(2):
+        path = os.path.join(tmp_dir, f"part{i}.csv")
+        pd.DataFrame({
+            "Email": ["a@x.com", "b@x.com", None, "a@x.com"],
+            "Phone": ["5551234567", "555-1234", None, "5559876543"],
+            "JoinDate": ["01/15/2024", "bad", None, "2024-02-20"]
+        }).to_csv(path, index=False)
+        stream_inputs.append(path)
+    
+    stream_output = os.path.join(tmp_dir, "out.csv")
+    stream_summary = stream_csv_pipeline(
+        stream_inputs, stream_output, "Email", ["JoinDate"], ["Phone"], chunk_size=3
+    )
+    streamed = pd.read_csv(stream_output)
+
+assert stream_summary["rows_before"] == 8
+assert stream_summary["blanks_removed"] == 2
+assert stream_summary["duplicates_removed"] == 4
+assert stream_summary["dates_fixed"] == 1
+assert stream_summary["phone_fixed"] == 1
+assert list(streamed["Email"]) == ["a@x.com", "b@x.com"]
+
+#TEST 16: Key-index dedup matches drop_duplicates across chunks
+
+df_keys = pd.DataFrame({
+    "Email": ["a", "b", "a", None, "c", "b", None, "a", 1, "1", 1.0],
+    "Row": range(11)
+})
+key_chunks = [df_keys.iloc[i:i + 3] for i in range(0, len(df_keys), 3)]
+
+for rule in ["first", "last", False]:
+    deduplicator = StreamingDeduplicator(["Email"], keep_rule=rule, verify=True)
+    if deduplicator.needs_observation:
+        for key_chunk in key_chunks:
+            deduplicator.observe(key_chunk)
+    kept = pd.concat([deduplicator.filter(key_chunk)[0] for key_chunk in key_chunks])
+    assert kept.equals(df_keys.drop_duplicates(subset=["Email"], keep=rule))
+
+# A hash collision between different keys is not treated as a duplicate
+key_index = KeyIndex(verify=True)
+key_index.remember(pd.Series([42], dtype="uint64").to_numpy(), ["x@example.com"])
+assert list(key_index.confirm(pd.Series([42, 42], dtype="uint64").to_numpy(), ["x@example.com", "y@example.com"])) == [True, False]
+assert key_index.collisions == 1
+
+#TEST 17: Formats learned up front give the same result as inferring in place
+
+learned_formats = infer_column_date_formats(df_dmy, ["JoinDate"])
+assert learned_formats == {"JoinDate": "%d/%m/%Y"}
+preset_dmy, count = standardize_dates(df_dmy, date_columns=["JoinDate"], column_formats=learned_formats)
+assert count == 4
+assert preset_dmy["JoinDate"].equals(cleaned_dmy["JoinDate"])
+
+# Sharded cleaning splits the frame and gives the serial frame and count
+df_shard = pd.DataFrame({
+    "JoinDate": ["01/15/2024", "bad", "March 10, 2024", None, "15/01/2024", "2024-02-20", "", "2024/01/15"],
+    "Signup": ["2024-01-01", "01/02/2024", None, "x", "Mar 10, 2024", "2024-03-04", "2024-05-06", "07/08/2024"],
+    "Phone": ["5551234567", "555.123.4567", None, "123", "+1-555-000-1111", "", "(555) 999-8888", "555-1234"],
+    "Mobile": ["555 000 1111", None, "5552223333", "n/a", "555-444-5555 x12", "5551234567", "", "0015556667777"],
+}, index=range(10, 18))
+for func, columns in [(standardize_dates, ["JoinDate", "Signup"]), (clean_phone_numbers, ["Phone", "Mobile"])]:
+    serial_shard_df, serial_count = func(df_shard, columns)
+    for shard_by in ["rows", "columns"]:
+        sharded_df, sharded_count = run_sharded(func, df_shard, columns, workers=2, shard_by=shard_by, min_shard_rows=3)
+        assert sharded_df.equals(serial_shard_df), (func.__name__, shard_by)
+        assert sharded_count == serial_count
+
+
+#TEST 18: Every Excel engine returns the same DataFrame as pd.read_excel
+
+sample_xlsx = os.path.join(os.path.dirname(__file__), '../test_data/test3_medium_customers.xlsx')
+for engine in ["auto", "openpyxl"]:
+    assert read_file(sample_xlsx, engine=engine).equals(pd.read_excel(sample_xlsx))
+
+# A stale <dimension> ref in the sheet XML does not truncate the read
+import re
+import zipfile
+with tempfile.TemporaryDirectory() as tmp:
+    sized_path = os.path.join(tmp, "sized.xlsx")
+    stale_path = os.path.join(tmp, "stale.xlsx")
+    pd.DataFrame({"A": range(10), "B": list("abcdefghij"), "C": range(10, 20)}).to_excel(sized_path, index=False)
+    with zipfile.ZipFile(sized_path) as source, zipfile.ZipFile(stale_path, "w") as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                content = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1:A2"', content)
+                assert b'ref="A1:A2"' in content
+            target.writestr(item, content)
+    assert read_file(stale_path, engine="auto").equals(pd.read_excel(sized_path))
+    
+    # Text that reads like an error code stays text; only real error cells are missing
+    from openpyxl import Workbook
+    codes_path = os.path.join(tmp, "codes.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Code"])
+    for value, data_type in [("#DIV/0!", "s"), ("#REF!", "s"), ("#N/A", "e")]:
+        ws.append([value])
+        ws.cell(row=ws.max_row, column=1).data_type = data_type
+    wb.save(codes_path)
+    codes = read_file(codes_path, engine="auto")["Code"]
+    assert codes.tolist()[:2] == ["#DIV/0!", "#REF!"] and pd.isna(codes.iloc[2])
+assert resolve_excel_engine("openpyxl") == "openpyxl"
+try:
+    resolve_excel_engine("xlrd")
+    assert False, "Expected ValueError for an unknown engine"
+except ValueError:
+    pass
+
+
+#TEST 19: Single-pass Excel writer formats the header and widths while writing
+
+df_out = pd.DataFrame({"Email": ["a@example.com", None], "Amount": [1.5, 20.25]})
+assert compute_column_widths(df_out) == [15, 8]
+with tempfile.TemporaryDirectory() as tmp:
+    out_path = os.path.join(tmp, "out.xlsx")
+    assert write_excel(df_out, out_path) == 2
+    assert pd.read_excel(out_path).equals(df_out)
+    ws = load_workbook(out_path).active
+    assert ws["A1"].font.bold and ws["B1"].alignment.horizontal == "center"
+    assert ws.column_dimensions["A"].width == 15
+
+
+#TEST 20: format_excel_output takes precomputed widths, or measures the sheet itself
+
+df_wide = pd.DataFrame({"Name": ["Alice", "Bartholomew", None], "Age": [25, 30, 35]})
+assert compute_column_widths(df_wide) == [13, 5]
+assert compute_column_widths(df_wide, sample_rows=1)[1] == 5
+with tempfile.TemporaryDirectory() as tmp:
+    out_path = os.path.join(tmp, "plain.xlsx")
+    df_wide.to_excel(out_path, index=False)
+    format_excel_output(out_path)
+    ws = load_workbook(out_path).active
+    assert ws["A1"].font.bold
+    assert [ws.column_dimensions[c].width for c in "AB"] == [13, 5]
+    
+    format_excel_output(out_path, column_widths=[30, 9])
+    ws = load_workbook(out_path).active
+    assert [ws.column_dimensions[c].width for c in "AB"] == [30, 9]
+
+
+#TEST 21: CSV.gz / Parquet / Feather writers, whole-frame and chunked
+
+df_cols = pd.DataFrame({"ID": [1, "A2", 3, 4], "Amount": [1.5, 2.0, None, 4.25]})
+with tempfile.TemporaryDirectory() as tmp:
+    readers_by_format = {".csv.gz": pd.read_csv, ".parquet": pd.read_parquet, ".feather": pd.read_feather}
+    for extension, read_back in readers_by_format.items():
+        if extension != ".csv.gz":
+            try:
+                import pyarrow
+            except ImportError:
+                continue
+        whole_path = os.path.join(tmp, "whole" + extension)
+        assert write_output(df_cols, whole_path) == 4
+        
+        chunked_path = os.path.join(tmp, "chunked" + extension)
+        writer = open_chunk_writer(chunked_path)
+        writer.write(df_cols.iloc[:2])
+        writer.write(df_cols.iloc[2:])
+        writer.close()
+        
+        assert read_back(whole_path).astype(str).equals(read_back(chunked_path).astype(str))
+        assert list(read_back(chunked_path)["Amount"].fillna(0)) == [1.5, 2.0, 0, 4.25]
+
+try:
+    write_output(df_cols, "out.json")
+    assert False, "Expected ValueError for an unsupported output format"
+except ValueError:
+    pass
+
+
+#TEST 22: Projection pushdown reads only the requested columns, from any input format
+
+with tempfile.TemporaryDirectory() as tmp:
+    wide = pd.DataFrame({"A": [1, 2], "Email": ["x@a.com", "y@a.com"], "B": ["p", "q"], "C": [0.5, 1.5]})
+    paths = [os.path.join(tmp, "wide.csv"), os.path.join(tmp, "wide.xlsx")]
+    wide.to_csv(paths[0], index=False)
+    wide.to_excel(paths[1], index=False)
+    try:
+        import pyarrow
+        paths.append(os.path.join(tmp, "wide.parquet"))
+        wide.to_parquet(paths[-1], index=False)
+        paths.append(os.path.join(tmp, "wide.feather"))
+        wide.to_feather(paths[-1])
+    except ImportError:
+        pass
+    
+    for path in paths:
+        assert read_file(path).equals(wide)
+        projected = read_file(path, columns=["C", "Email"])
+        assert list(projected.columns) == ["Email", "C"]
+        assert projected.equals(wide[["Email", "C"]])
+    assert read_file(paths[1], engine="openpyxl", columns=["B"]).equals(wide[["B"]])
+    
+    merged = merge_excel_files(paths, columns=["Email"])
+    assert list(merged.columns) == ["Email"] and len(merged) == 2 * len(paths)
+    
+    try:
+        read_file(paths[0], columns=["Missing"])
+        assert False, "Expected ValueError for a missing column"
+    except ValueError:
+        pass
+
+
+#TEST 23: Incremental cache reuses unchanged files and re-cleans changed ones
+
+with tempfile.TemporaryDirectory() as tmp:
+    inputs = []
+    for i in range(2):
+        path = os.path.join(tmp, f"in{i}.csv")
+        pd.DataFrame({"Email": [f"a{i}@x.com", ""], "Phone": ["555-123-4567", None]}).to_csv(path, index=False)
+        inputs.append(path)
+    
+    cache_dir = os.path.join(tmp, "cache")
+    settings = {"phone_columns": ["Phone"]}
+    clean = lambda path: clean_single_file(path, "Email", [], ["Phone"])
+    
+    first = load_cleaned_files(inputs, IncrementalCache(cache_dir), settings, clean)
+    assert [from_cache for _, _, from_cache in first] == [False, False]
+    assert first[0][1]["blanks_removed"] == 1
+    assert first[0][0]["Phone"].tolist() == ["(555) 123-4567"]
+    
+    # Change one input: only that file is cleaned again
+    pd.DataFrame({"Email": ["b@x.com"], "Phone": ["5559876543"]}).to_csv(inputs[1], index=False)
+    cache = IncrementalCache(cache_dir)
+    second = load_cleaned_files(inputs, cache, settings, clean)
+    assert [from_cache for _, _, from_cache in second] == [True, False]
+    assert second[0][0].equals(first[0][0])
+    assert second[1][0]["Email"].tolist() == ["b@x.com"]
+    
+    # Different settings are a different cache entry
+    load_cleaned_files(inputs[:1], cache, {"phone_columns": []}, clean)
+    assert cache.misses == 2
+    
+    # Two runs that loaded the same manifest both keep their entries when they save
+    shared_dir = os.path.join(tmp, "shared_cache")
+    first_run, second_run = IncrementalCache(shared_dir), IncrementalCache(shared_dir)
+    load_cleaned_files(inputs[:1], first_run, settings, clean)
+    load_cleaned_files(inputs[1:], second_run, settings, clean)
+    merged = IncrementalCache(shared_dir)
+    assert len(merged.manifest["entries"]) == 2 and len(merged.manifest["files"]) == 2
+    assert sorted(os.listdir(shared_dir)) == sorted(
+        [MANIFEST_NAME] + [entry["data_file"] for entry in merged.manifest["entries"].values()]
+    )
+    
+    # Size-based eviction keeps only what fits
+    tiny_cache = IncrementalCache(cache_dir, max_size_mb=0)
+    load_cleaned_files(inputs, tiny_cache, {"other": True}, clean)
+    assert len(tiny_cache.manifest["entries"]) == 1 and tiny_cache.evicted >= 1
+    
+    # The pipeline's cache key covers the reader and the cleaning code version
+    config = {
+        "files": {"input_files": inputs, "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email", "phone_columns": ["Phone"]},
+        "performance": {"incremental": True, "cache_dir": os.path.join(tmp, "pipeline_cache")},
+    }
+    engine_runs = [("openpyxl", "cleaned 2"), ("openpyxl", "Loaded 2")]
+    if calamine_available():
+        engine_runs.append(("calamine", "cleaned 2"))
+    for engine, expected in engine_runs:
+        lines = []
+        run_pipeline(dict(config, performance=dict(config["performance"], excel_engine=engine)),
+                     log=lambda line="": lines.append(line))
+        assert any(expected in line for line in lines if "from cache" in line), (engine, expected)
+
+    # A whitespace-only key (pd.NA after blank removal) next to a missing one (NaN)
+    # dedups the same from the cache as when cleaned, alone or merged with a fresh file
+    keys_paths = [os.path.join(tmp, "keys1.csv"), os.path.join(tmp, "keys2.csv")]
+    pd.DataFrame({"Email": ["a@x", None, "  ", "b@x"], "N": [1, 2, 3, 4]}).to_csv(keys_paths[0], index=False)
+    pd.DataFrame({"Email": [None, "c@x"], "N": [5, 6]}).to_csv(keys_paths[1], index=False)
+    config = {
+        "files": {"input_files": keys_paths, "output_file": os.path.join(tmp, "keys_out.csv")},
+        "cleaning_options": {"duplicate_column": "Email"},
+    }
+    expected_rows = run_pipeline(config).stats["final_rows"]
+    config["performance"] = {"incremental": True, "cache_dir": os.path.join(tmp, "keys_cache")}
+    cold_rows = run_pipeline(config).stats["final_rows"]
+    warm_rows = run_pipeline(config).stats["final_rows"]
+    assert cold_rows == warm_rows == expected_rows
+    
+    # Only the second file changes, so the first comes from the cache
+    pd.DataFrame({"Email": [None, "d@x"], "N": [5, 6]}).to_csv(keys_paths[1], index=False)
+    mixed_rows = run_pipeline(config).stats["final_rows"]
+    del config["performance"]
+    assert mixed_rows == run_pipeline(config).stats["final_rows"]
+
+
+#TEST 24: Run report records per-stage rows and timings, summed over repeated stages
+
+report = RunReport(trace_memory=True)
+for chunk_rows in [5, 3]:
+    with report.stage("dedup", rows_in=chunk_rows) as stage:
+        stage["rows_out"] = chunk_rows - 1
+report.stats = {"final_rows": 6}
+report.finish()
+report_dict = report.to_dict()
+dedup_stage = report_dict["stages"][0]
+assert dedup_stage["name"] == "dedup" and dedup_stage["calls"] == 2
+assert dedup_stage["rows_in"] == 8 and dedup_stage["rows_out"] == 6
+assert dedup_stage["wall_s"] >= 0 and dedup_stage["peak_traced_mb"] is not None
+# RSS is the process-wide high-water mark; each stage also records how much it raised it
+if dedup_stage["process_peak_rss_mb"] is not None:
+    assert dedup_stage["rss_peak_growth_mb"] >= 0
+    assert report_dict["totals"]["process_peak_rss_mb"] >= dedup_stage["process_peak_rss_mb"]
+with tempfile.TemporaryDirectory() as tmp:
+    report.save(os.path.join(tmp, "report.json"))
+    with open(os.path.join(tmp, "report.json")) as f:
+        assert json.load(f)["stats"]["final_rows"] == 6
+
+
+#TEST 25: Library API returns the cleaned frame and raises typed errors
+
+with tempfile.TemporaryDirectory() as tmp:
+    first_path = os.path.join(tmp, "a.csv")
+    second_path = os.path.join(tmp, "b.csv")
+    pd.DataFrame({"Email": ["a@x.com", "a@x.com", ""], "Phone": ["555-123-4567", None, None]}).to_csv(first_path, index=False)
+    pd.DataFrame({"Email": ["b@x.com"], "Phone": ["555.987.6543"]}).to_csv(second_path, index=False)
+    config = {
+        "files": {"input_files": [first_path, second_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email", "phone_columns": ["Phone"]}
+    }
+    result = run_pipeline(config)
+    assert result.df["Email"].tolist() == ["a@x.com", "b@x.com"]
+    assert result.stats["duplicates_removed"] == 1 and result.stats["final_rows"] == 2
+    assert pd.read_csv(result.output_file)["Phone"].tolist() == ["(555) 123-4567", "(555) 987-6543"]
+    # The date step has no columns, so it is skipped with a warning instead of failing
+    assert any("Date standardization skipped" in w for w in result.warnings)
+    
+    pd.DataFrame({"Mail": ["c@x.com"]}).to_csv(second_path, index=False)
+    try:
+        run_pipeline(config)
+        assert False, "Should raise ColumnMismatchError"
+    except ColumnMismatchError:
+        pass
+    
+    for bad_config in [{"files": {}}, dict(config, cleaning_options={"duplicate_column": "Email", "keep_rule": "middle"})]:
+        try:
+            run_pipeline(bad_config)
+            assert False, "Should raise ConfigError"
+        except ConfigError:
+            pass
+    
+    try:
+        run_pipeline(dict(config, files={"input_files": [os.path.join(tmp, "missing.csv")], "output_file": config["files"]["output_file"]}))
+        assert False, "Should raise InputFileError"
+    except InputFileError:
+        pass
+
+    # Unreadable contents raise InputFileError naming the file, whichever way they are read
+    corrupt_xlsx = os.path.join(tmp, "corrupt.xlsx")
+    with open(corrupt_xlsx, "wb") as f:
+        f.write(b"not a zip file")
+    undecodable_csv = os.path.join(tmp, "undecodable.csv")
+    with open(undecodable_csv, "wb") as f:
+        f.write(b"Email,Phone\na@x.com,1\n\xff\xfe@x.com,2\n")
+    for path, performance in [(corrupt_xlsx, {}), (corrupt_xlsx, {"incremental": True, "cache_dir": os.path.join(tmp, "cache")}),
+                              (undecodable_csv, {}), (undecodable_csv, {"streaming": True, "chunk_size": 1})]:
+        try:
+            run_pipeline(dict(config, files=dict(config["files"], input_files=[path]), performance=performance))
+            assert False, "Should raise InputFileError"
+        except InputFileError as e:
+            assert path in str(e), (path, performance)
+
+
+#TEST 26: Batch runner records passing and failing jobs in one results file
+
+with tempfile.TemporaryDirectory() as tmp:
+    input_path = os.path.join(tmp, "in.csv")
+    pd.DataFrame({"Email": ["a@x.com", "a@x.com", "b@x.com"]}).to_csv(input_path, index=False)
+    good_config = {
+        "files": {"input_files": [input_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email"}
+    }
+    config_path = os.path.join(tmp, "good.json")
+    with open(config_path, "w") as f:
+        json.dump(good_config, f)
+    
+    results_path = os.path.join(tmp, "results.json")
+    batch_results = run_batch([config_path, {"files": {}}], workers=1, results_file=results_path)
+    assert batch_results["passed"] == 1 and batch_results["failed"] == 1
+    good_job, bad_job = batch_results["jobs"]
+    assert good_job["name"] == config_path and good_job["stats"]["final_rows"] == 2
+    assert "dedup" in good_job["stages"] and good_job["wall_s"] >= 0
+    assert bad_job["error_type"] == "ConfigError"
+    with open(results_path) as f:
+        assert json.load(f)["passed"] == 1
+    # A results file from an earlier run is not picked up as a config
+    assert collect_config_files([tmp]) == [config_path]
+    
+    # Warm worker processes give the same entries, in job order
+    pool_results = run_batch([config_path, {"files": {}}, config_path], workers=2)
+    assert pool_results["workers"] == 2
+    assert [job["status"] for job in pool_results["jobs"]] == ["passed", "failed", "passed"]
+    assert pool_results["jobs"][2]["stats"]["final_rows"] == 2
+    assert all(job["pid"] != os.getpid() for job in pool_results["jobs"])
+    
+    # Parallel incremental jobs sharing one cache directory all end up in its manifest
+    shared_configs = []
+    for i in range(4):
+        job_input = os.path.join(tmp, f"job{i}.csv")
+        pd.DataFrame({"Email": [f"user{i}@x.com"]}).to_csv(job_input, index=False)
+        shared_configs.append({
+            "files": {"input_files": [job_input], "output_file": os.path.join(tmp, f"job{i}_out.csv")},
+            "cleaning_options": {"duplicate_column": "Email"},
+            "performance": {"incremental": True, "cache_dir": os.path.join(tmp, "batch_cache")},
+        })
+    assert run_batch(shared_configs, workers=2)["passed"] == 4
+    assert len(IncrementalCache(os.path.join(tmp, "batch_cache")).manifest["entries"]) == 4
+
+
+#TEST 27: --validate checks the config without importing pandas (measured with -X importtime)
+
+with tempfile.TemporaryDirectory() as tmp:
+    config_path = os.path.join(tmp, "config.json")
+    with open(config_path, "w") as f:
+        json.dump({
+            "files": {"input_files": ["tests/test_data/test1_small_sales.xlsx"], "output_file": os.path.join(tmp, "out.xlsx")},
+            "cleaning_options": {"duplicate_column": "CustomerEmail"}
+        }, f)
+    import_ms, imported, _ = import_profile(["main.py", "--validate", "--config", config_path])
+    assert not [name for name in imported if name.split(".")[0] in ("pandas", "numpy", "openpyxl")]
+    print(f"  --validate startup imports: {import_ms:.1f} ms")
+
+for bad_performance in [{"excel_engine": "fast"}, {}]:
+    bad_config = {
+        "files": {"input_files": ["a.csv"], "output_file": "out.csv" if bad_performance else "out.txt"},
+        "cleaning_options": {"duplicate_column": "Email"},
+        "performance": bad_performance
+    }
+    try:
+        validate_config(bad_config)
+        assert False, "Should raise ConfigError"
+    except ConfigError:
+        pass
+
+
+#TEST 28: Compact dtypes use less memory and the cleaners give the same results
+
+wide_df = pd.DataFrame({
+    "ID": range(200),
+    "Email": [f"user{i % 150}@x.com" for i in range(200)],
+    "State": ["NY", "CA", "  ", None] * 50,
+    "Phone": ["555-123-4567", "(555) 987 6543", None, "bad"] * 50,
+    "Date": ["01/15/2024", "2024-02-20", "March 10, 2024", None] * 50,
+    "Mixed": [1, "a", 2.5, None] * 50,
+})
+compact_df, compaction = compact_dtypes(wide_df)
+assert isinstance(compact_df["State"].dtype, pd.CategoricalDtype)
+assert compact_df["ID"].dtype == "int16" and compact_df["Mixed"].dtype == object
+assert compaction["memory_after_mb"] < compaction["memory_before_mb"]
+assert wide_df["ID"].dtype == "int64", "Input frame should not be modified"
+
+def run_cleaners(df):
+    df, _ = remove_blank_rows(df)
+    df, _ = remove_duplicates(df, subset_columns=["Email"])
+    df, _ = standardize_dates(df, ["Date"])
+    df, _ = clean_phone_numbers(df, ["Phone"])
+    return df.astype(object).where(df.notna(), None)
+
+assert run_cleaners(compact_df).equals(run_cleaners(wide_df))
+
+# A missing key (NaN) next to a whitespace-only one (pd.NA once blanked) keeps
+# its kind, so the pipeline removes the same duplicates with compact dtypes
+with tempfile.TemporaryDirectory() as tmp:
+    keys_path = os.path.join(tmp, "keys.csv")
+    pd.DataFrame({"Email": ["a@x", None, "  ", "b@x"], "N": [1, 2, 3, 4]}).to_csv(keys_path, index=False)
+    config = {
+        "files": {"input_files": [keys_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email"},
+    }
+    plain_stats = run_pipeline(config).stats
+    config["performance"] = {"compact_dtypes": True}
+    compact_stats = run_pipeline(config).stats
+    assert compact_stats["duplicates_removed"] == plain_stats["duplicates_removed"]
+    assert compact_stats["final_rows"] == plain_stats["final_rows"]
+
+
+#TEST 29: inplace mode cleans the caller's frame without copying, with the same results
+
+import warnings
+source_df = pd.DataFrame({
+    "Email": ["a@x.com", "a@x.com", "b@x.com"],
+    "Date": ["01/15/2024", "bad", "March 10, 2024"],
+    "Phone": ["555-123-4567", None, "5559876543"],
+})
+expected_df, _ = standardize_dates(source_df, ["Date"])
+expected_df, _ = clean_phone_numbers(expected_df, ["Phone"])
+
+with warnings.catch_warnings():
+    warnings.simplefilter("error")
+    # A frame sliced by drop_duplicates takes new columns without SettingWithCopyWarning
+    owned_df, _ = remove_duplicates(source_df, subset_columns=["Email"])
+    owned_df = owned_df.reset_index(drop=True)
+    result_df, _ = standardize_dates(owned_df, ["Date"], inplace=True)
+    assert result_df is owned_df
+    result_df, _ = clean_phone_numbers(result_df, ["Phone"], inplace=True)
+    assert result_df is owned_df
+assert result_df.equals(expected_df.drop_duplicates(subset=["Email"]).reset_index(drop=True))
+assert source_df["Date"].tolist() == ["01/15/2024", "bad", "March 10, 2024"], "Source frame should be unchanged"
+
+# A missing column fails before anything is changed
+untouched_df = source_df.copy()
+try:
+    standardize_dates(untouched_df, ["Date", "Missing"], inplace=True)
+    assert False, "Should raise MissingColumnError"
+except ValueError:
+    pass
+assert untouched_df.equals(source_df)
+
+
+#TEST 30: The fused block executor gives the same frame and counts as stage by stage
+
+raw_df = pd.DataFrame({
+    "Email": ["a@x.com", None, "b@x.com", "a@x.com", "c@x.com", "b@x.com", "d@x.com", "c@x.com"],
+    "Date": ["01/15/2024", None, "bad", "2024-02-01", "March 10, 2024", "02/03/2024", "", "12/31/2023"],
+    "Phone": ["555-123-4567", None, "5559876543", "555.111.2222", "123", "(555) 000-1111", "5551234567", None],
+})
+for keep in ["first", "last", False]:
+    staged_df, blanks = remove_blank_rows(raw_df)
+    staged_df, duplicates = remove_duplicates(staged_df, subset_columns=["Email"], keep_rule=keep)
+    staged_df, dates = standardize_dates(staged_df, ["Date"])
+    staged_df, phones = clean_phone_numbers(staged_df, ["Phone"])
+    
+    plan = BlockPlan("Email", ["Date"], ["Phone"], keep_rule=keep)
+    fused_df, fused_summary = run_fused(raw_df.copy(), plan, block_rows=3)
+    assert fused_df.equals(staged_df), f"keep={keep}: frames differ"
+    assert fused_df.index.equals(staged_df.index), f"keep={keep}: index differs"
+    assert fused_summary["blocks"] == 3
+    assert (fused_summary["blanks_removed"], fused_summary["duplicates_removed"],
+            fused_summary["dates_fixed"], fused_summary["phone_fixed"]) == (blanks, duplicates, dates, phones)
+
+# None, NaN and the pd.NA left in whitespace-only cells are different keys, as in drop_duplicates
+import numpy as np
+missing_df = pd.DataFrame({"Email": [None, "a", np.nan, "b", None, "  ", "a"], "Date": ["01/15/2024"] * 7})
+for keep, verify in [("first", False), ("first", True), ("last", False), (False, False)]:
+    staged_df, _ = remove_blank_rows(missing_df)
+    staged_df, duplicates = remove_duplicates(staged_df, subset_columns=["Email"], keep_rule=keep)
+    staged_df, _ = standardize_dates(staged_df, ["Date"])
+    plan = BlockPlan("Email", ["Date"], [], keep_rule=keep, verify_keys=verify)
+    fused_df, fused_summary = run_fused(missing_df.copy(), plan, block_rows=2)
+    assert fused_df.equals(staged_df) and fused_df.index.equals(staged_df.index), f"keep={keep}"
+    assert fused_df["Email"].map(type).tolist() == staged_df["Email"].map(type).tolist()
+    assert fused_summary["duplicates_removed"] == duplicates
+
+# With several key columns, drop_duplicates treats every missing value as one key
+missing_df["Zip"] = [1, 1, 1, 2, 1, 2, 2]
+for keep in ["first", "last", False]:
+    dedup = StreamingDeduplicator(["Email", "Zip"], keep_rule=keep)
+    chunks = [missing_df.iloc[:3], missing_df.iloc[3:]]
+    if dedup.needs_observation:
+        for chunk in chunks:
+            dedup.observe(chunk)
+    streamed_df = pd.concat([dedup.filter(chunk)[0] for chunk in chunks])
+    assert streamed_df.index.equals(missing_df.drop_duplicates(subset=["Email", "Zip"], keep=keep).index), f"keep={keep}"
+
+# A missing date column is reported once and the other stages still run
+plan = BlockPlan("Email", ["Missing"], ["Phone"])
+fused_df, fused_summary = run_fused(raw_df.copy(), plan, block_rows=3)
+assert "Missing" in fused_summary["date_error"] and fused_summary["phone_error"] is None
+assert fused_df["Date"].tolist()[:2] == ["01/15/2024", "bad"]
+
+
+#TEST 31: A cleaned duplicate column is normalized before dedup; rows saved are reported
+
+with tempfile.TemporaryDirectory() as tmp:
+    input_path = os.path.join(tmp, "phones.csv")
+    pd.DataFrame({
+        "Phone": ["555-123-4567", "(555) 123-4567", "unknown", "none given", "555.987.6543"],
+        "Date": ["01/15/2024", "2024-01-15", "bad", "bad", "March 10, 2024"],
+    }).to_csv(input_path, index=False)
+    config = {
+        "files": {"input_files": [input_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Phone", "date_columns": ["Date"], "phone_columns": ["Phone"]}
+    }
+    raw_result = run_pipeline(config)
+    assert raw_result.stats["duplicates_removed"] == 0
+    
+    config["cleaning_options"]["normalize_duplicate_key"] = True
+    for performance in [{}, {"fused": True, "block_rows": 2}]:
+        result = run_pipeline(dict(config, performance=performance))
+        # Unparseable keys are compared as read, so both of them stay
+        assert result.df["Phone"].tolist() == ["(555) 123-4567", "", "", "(555) 987-6543"]
+        assert result.stats["duplicates_removed"] == 1 and result.stats["phone_fixed"] == 2
+        assert result.stats["rows_saved"] == {"key_phones": 0, "dates": 1}
+        assert result.stats["dates_fixed"] == 2
+    
+    # Incremental runs clean each file before deduplicating, so nothing is saved
+    result = run_pipeline(dict(config, performance={"incremental": True, "cache_dir": os.path.join(tmp, "cache")}))
+    assert result.df["Phone"].tolist() == ["(555) 123-4567", "", "", "(555) 987-6543"]
+    assert result.stats["duplicates_removed"] == 1
+    assert result.stats["rows_saved"] == {"key_phones": 0, "dates": 0}
+    
+    # Nothing to normalize when the key is not a cleaned column
+    plan = StagePlan("Email", ["Date"], ["Phone"], normalize_key=True)
+    assert plan.stages == ["blank_rows", "dedup", "dates", "phones"] and plan.dedup_column == "Email"
+
+
+#TEST 32: Normalized-key dedup treats case, spaces and phone punctuation as the same key
+
+keys_df = pd.DataFrame({
+    "Email": [" John@X.com", "john@x.com", "JOHN@X.COM ", None, None, "b@x.com"],
+    "Phone": ["555-123-4567", "(555) 123 4567", "555-123-4567 ", "n/a", "unknown", "555.000.1111"],
+})
+deduped_df, removed = remove_duplicates(keys_df, ["Email"], key_normalizers=["strip", "lower"])
+assert deduped_df.index.tolist() == [0, 3, 5] and removed == 3
+deduped_df, removed = remove_duplicates(keys_df, ["Email"], keep_rule="last", key_normalizers=["strip", "lower"])
+assert deduped_df.index.tolist() == [2, 4, 5]
+# Values without digits keep their text, so 'n/a' and 'unknown' stay apart
+deduped_df, removed = remove_duplicates(keys_df, ["Phone"], key_normalizers=["digits"])
+assert deduped_df.index.tolist() == [0, 3, 4, 5]
+deduped_df, removed = remove_duplicates(keys_df, ["Email", "Phone"], key_normalizers=["strip", "lower"])
+assert deduped_df.index.tolist() == [0, 1, 3, 4, 5]
+
+# Object keys without strings are compared as they are; only str values are normalized
+numeric_keys = pd.DataFrame({"K": pd.Series([1, 2, 1, None], dtype=object), "Flag": [True, None, True, False]})
+deduped_df, removed = remove_duplicates(numeric_keys, ["K"], key_normalizers=["strip"])
+assert deduped_df.index.tolist() == [0, 1, 3] and removed == 1
+deduped_df, removed = remove_duplicates(numeric_keys, ["Flag"], key_normalizers=["strip", "lower"])
+assert deduped_df.index.tolist() == [0, 1, 3] and removed == 1
+mixed_keys = pd.DataFrame({"K": pd.Series([" B", 7, "b", 7, None], dtype=object)})
+deduped_df, removed = remove_duplicates(mixed_keys, ["K"], key_normalizers=["strip", "lower"])
+assert deduped_df.index.tolist() == [0, 1, 4] and removed == 2
+assert remove_fuzzy_duplicates(numeric_keys, "Flag")[1]["duplicates_removed"] == 1
+
+# Missing keys are compared like drop_duplicates: by kind for one column, all equal for several
+missing_keys = pd.DataFrame({"Email": [None, "a", float("nan"), "b", None, pd.NA, "A "], "Zip": [1, 1, 1, 2, 1, 2, 2]})
+for columns in [["Email"], ["Email", "Zip"]]:
+    for keep in ["first", "last", False]:
+        deduped_df, removed = remove_duplicates(missing_keys, columns, keep_rule=keep, key_normalizers=["strip"])
+        assert deduped_df.index.equals(missing_keys.drop_duplicates(subset=columns, keep=keep).index), (columns, keep)
+
+# Streaming dedup gives the same rows, chunk by chunk
+for keep in ["first", "last", False]:
+    dedup = StreamingDeduplicator(["Email"], keep_rule=keep, normalizers=["strip", "lower"])
+    chunks = [keys_df.iloc[:2], keys_df.iloc[2:]]
+    if dedup.needs_observation:
+        for chunk in chunks:
+            dedup.observe(chunk)
+    streamed_df = pd.concat([dedup.filter(chunk)[0] for chunk in chunks])
+    expected_df, _ = remove_duplicates(keys_df, ["Email"], keep_rule=keep, key_normalizers=["strip", "lower"])
+    assert streamed_df.equals(expected_df), f"keep={keep}"
+
+try:
+    remove_duplicates(keys_df, ["Email"], key_normalizers=["upper"])
+    assert False, "Should raise ValueError"
+except ValueError:
+    pass
+
+
+#TEST 33: Fuzzy dedup merges typos, scores only candidate pairs and respects blocks
+
+assert bounded_edit_distance("jon@x.com", "john@x.com", 1) == 1
+assert bounded_edit_distance("kitten", "sitting", 2) == 3, "Distances above the bound are capped"
+crm_df = pd.DataFrame({
+    "Email": ["john@x.com", "jon@x.com", "JOHN@X.COM", "mary@y.org", "marx@y.org", "zed@z.net", None, None],
+    "Zip": ["10001", "10001", "10001", "20002", "30003", "40004", "50005", "50005"],
+})
+fuzzy_df, fuzzy_summary = remove_fuzzy_duplicates(crm_df, "Email")
+assert fuzzy_df.index.tolist() == [0, 3, 5, 6]
+assert fuzzy_summary["duplicates_removed"] == 4 and fuzzy_summary["fuzzy_pairs"] == 2
+assert 0 < fuzzy_summary["candidate_pairs"] <= 10, "Only neighbors of the 5 distinct keys are scored"
+
+# 'mary' and 'marx' are in different ZIP blocks, so they are not compared
+blocked_df, blocked_summary = remove_fuzzy_duplicates(crm_df, "Email", block_column="Zip")
+assert blocked_df.index.tolist() == [0, 3, 4, 5, 6]
+deduped_df, removed = remove_duplicates(crm_df, ["Email"], keep_rule="last", fuzzy={"max_distance": 1})
+assert deduped_df.index.tolist() == [2, 4, 5, 7] and removed == 4
+
+with tempfile.TemporaryDirectory() as tmp:
+    input_path = os.path.join(tmp, "crm.csv")
+    crm_df.to_csv(input_path, index=False)
+    result = run_pipeline({
+        "files": {"input_files": [input_path], "output_file": os.path.join(tmp, "out.csv")},
+        "cleaning_options": {"duplicate_column": "Email", "fuzzy_duplicates": True}
+    })
+    assert result.stats["duplicates_removed"] == 4
+    assert result.stats["candidate_pairs"] == fuzzy_summary["candidate_pairs"]
+
+
+print("✓ All tests passed")
+# Missing keys are grouped by kind like drop_duplicates, even when no key is present
+for missing_keys_df in [pd.DataFrame({"Email": [None, "ann@x.com", float("nan"), None, pd.NA, "bob@y.org"]}),
+                        pd.DataFrame({"Email": pd.Series([None, None, pd.NA], dtype=object)})]:
+    for keep in ["first", "last", False]:
+        fuzzy_df, _ = remove_fuzzy_duplicates(missing_keys_df, "Email", keep_rule=keep)
+        assert fuzzy_df.index.equals(missing_keys_df.drop_duplicates(subset=["Email"], keep=keep).index), f"keep={keep}"
+
+
+#TEST 34: Reading files in a process pool keeps their order and raises the first error
+
+test_data_dir = os.path.join(os.path.dirname(__file__), '../test_data')
+monthly_files = [
+    os.path.join(test_data_dir, f"test5_transactions_{month}.xlsx") for month in ["january", "february", "march"]
+]
+serial_df = merge_excel_files(monthly_files)
+parallel_df = merge_excel_files(monthly_files, workers=2)
+assert parallel_df.equals(serial_df)
+assert merge_excel_files(monthly_files[::-1], workers=2).equals(merge_excel_files(monthly_files[::-1]))
+
+try:
+    merge_excel_files(monthly_files[:1] + [os.path.join(test_data_dir, "missing.xlsx")] + monthly_files[1:], workers=2)
+    assert False, "Should raise FileNotFoundError"
+except FileNotFoundError:
+    pass
+try:
+    merge_excel_files(monthly_files + [os.path.join(test_data_dir, "test4_inventory.xlsx")], workers=2)
+    assert False, "Should raise ColumnMismatchError"
+except ColumnMismatchError:
+    pass
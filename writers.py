@@ -0,0 +1,333 @@
+import gzip
+
+# pandas and openpyxl are imported where they are used, so output_format()
+# stays cheap to import (config validation uses it)
+
+
+# Maximum number of rows in an Excel worksheet (including the header)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Extra characters added to the longest value when sizing a column
+COLUMN_PADDING = 2
+
+# Output extensions the writers understand
+OUTPUT_FORMATS = ['.xlsx', '.csv', '.csv.gz', '.parquet', '.feather']
+
+
+def output_format(file_path):
+    """
+    Return the output format for a path, from its extension.
+    
+    Raises:
+    ValueError: If the extension is not one of OUTPUT_FORMATS
+    """
+    lower_path = file_path.lower()
+    for extension in OUTPUT_FORMATS:
+        if lower_path.endswith(extension):
+            return extension
+    raise ValueError(f"Unsupported output format: {file_path} (use one of {OUTPUT_FORMATS})")
+
+
+def compute_column_widths(df, sample_rows=None):
+    """
+    Compute Excel column widths from the DataFrame's longest values.
+    
+    Each column is as wide as its longest value or header (as text),
+    plus COLUMN_PADDING. Empty cells don't count. With sample_rows, only a
+    random sample of that many rows is measured, so the cost stays the
+    same however large the sheet is (a rare longer value may be cut off).
+    
+    Parameters:
+    df (pd.DataFrame): Data that will be written
+    sample_rows (int or None): Measure at most this many rows (None = all)
+    
+    Returns:
+    list: Width per column, in column order
+    """
+    if sample_rows is not None and len(df) > sample_rows:
+        df = df.sample(n=sample_rows, random_state=0)
+    
+    widths = []
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        values = values[values.notna()]
+        longest = int(values.astype(str).str.len().max()) if len(values) else 0
+        widths.append(max(longest, len(str(col))) + COLUMN_PADDING)
+    return widths
+
+
+class CsvChunkWriter:
+    """
+    Append DataFrame chunks to a CSV file, writing the header once.
+    
+    Paths ending in .gz are written as a single gzip stream.
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.rows_written = 0
+        self._header_written = False
+        if file_path.lower().endswith('.gz'):
+            self._file = gzip.open(file_path, 'wt', newline='')
+        else:
+            self._file = open(file_path, 'w', newline='')
+    
+    def write(self, df):
+        df.to_csv(self._file, header=not self._header_written, index=False)
+        self._header_written = True
+        self.rows_written += len(df)
+    
+    def close(self):
+        self._file.close()
+
+
+def _require_pyarrow():
+    """Import pyarrow, with a helpful message when it is missing."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Feather output need pyarrow - install it with: pip install pyarrow")
+    return pyarrow
+
+
+def _arrow_table(df, schema=None):
+    """
+    Convert a DataFrame to an Arrow table.
+    
+    Object columns mixing strings and numbers (common in merged exports)
+    are written as strings, since Arrow columns have a single type. With
+    a schema, the table is cast to it so every chunk of a file matches.
+    """
+    import pandas as pd
+    
+    pa = _require_pyarrow()
+    
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object
+        and pd.api.types.infer_dtype(df[col], skipna=True) in ("mixed", "mixed-integer")
+    ]
+    if mixed:
+        df = df.copy()
+        for col in mixed:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        return table
+    
+    try:
+        return table.cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(
+            f"Column types changed between chunks and cannot be written to one file: {e}. "
+            f"Use a larger chunk_size or a .csv output_file."
+        )
+
+
+def _chunk_schema(table):
+    """Schema for a whole file from its first chunk (all-empty columns become strings)."""
+    pa = _require_pyarrow()
+    fields = [
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]
+    return pa.schema(fields)
+
+
+class ArrowChunkWriter:
+    """
+    Write DataFrame chunks to a Parquet or Feather (Arrow IPC) file.
+    
+    The file's schema comes from the first chunk and later chunks are cast
+    to it. Each chunk becomes one Parquet row group, or one record batch
+    in a Feather file, so memory stays bounded by the chunk size.
+    
+    Parameters:
+    file_path (str): Output .parquet or .feather path
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.rows_written = 0
+        self.is_parquet = file_path.lower().endswith('.parquet')
+        self._pa = _require_pyarrow()
+        self._schema = None
+        self._writer = None
+    
+    def _open(self, schema):
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.file_path, schema)
+        compression = "lz4" if self._pa.Codec.is_available("lz4_frame") else None
+        options = self._pa.ipc.IpcWriteOptions(compression=compression)
+        return self._pa.ipc.new_file(self.file_path, schema, options=options)
+    
+    def write(self, df):
+        if self._writer is None:
+            table = _arrow_table(df)
+            self._schema = _chunk_schema(table)
+            self._writer = self._open(self._schema)
+        table = _arrow_table(df, self._schema)
+        self._writer.write_table(table)
+        self.rows_written += len(df)
+    
+    def close(self):
+        if self._writer is None:
+            # No chunks at all: still leave a valid (empty) file behind
+            self._writer = self._open(self._pa.schema([]))
+        self._writer.close()
+
+
+class ExcelChunkWriter:
+    """
+    Stream DataFrame chunks into an .xlsx file using openpyxl write-only mode.
+    
+    With format_output, the header is bold and centered and the column
+    widths are set as the file is written, so it never has to be
+    reloaded. Write-only sheets need the widths before the first row: they
+    come from column_widths if given, otherwise from the first chunk.
+    
+    Parameters:
+    file_path (str): Output .xlsx path
+    format_output (bool): Apply bold headers and column widths
+    column_widths (list or None): Width per column
+    """
+    
+    def __init__(self, file_path, format_output=False, column_widths=None):
+        self.file_path = file_path
+        self.format_output = format_output
+        self.column_widths = column_widths
+        from openpyxl import Workbook
+        
+        self.rows_written = 0
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._header_written = False
+    
+    def _write_header(self, df):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Alignment
+        from openpyxl.utils import get_column_letter
+        
+        if not self.format_output:
+            self._ws.append([str(col) for col in df.columns])
+            return
+        
+        widths = self.column_widths or compute_column_widths(df)
+        for i, width in enumerate(widths, start=1):
+            self._ws.column_dimensions[get_column_letter(i)].width = width
+        
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(self._ws, value=str(col))
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal='center')
+            header.append(cell)
+        self._ws.append(header)
+    
+    def write(self, df):
+        if self.rows_written + len(df) + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(
+                f"Output has more than {EXCEL_MAX_ROWS - 1} rows, which does not fit in an "
+                f"Excel sheet. Use a .csv output_file for large inputs."
+            )
+        
+        if not self._header_written:
+            self._write_header(df)
+            self._header_written = True
+        
+        # openpyxl wants None for empty cells
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self._ws.append(row)
+        self.rows_written += len(df)
+    
+    def close(self):
+        self._wb.save(self.file_path)
+
+
+def write_excel(df, file_path, format_output=True, width_sample_rows=None, column_widths=None):
+    """
+    Write a DataFrame to .xlsx in a single pass.
+    
+    Replaces to_excel followed by format_excel_output: the header style
+    and column widths are applied while the rows are streamed out, so the
+    workbook is neither reloaded nor saved twice.
+    
+    Parameters:
+    df (pd.DataFrame): Data to write
+    file_path (str): Output .xlsx path
+    format_output (bool): Apply bold headers and auto column widths
+    width_sample_rows (int or None): Size columns from a sample of this many rows
+    column_widths (list or None): Precomputed widths (skips measuring the data)
+    
+    Returns:
+    int: Number of rows written
+    """
+    if format_output and column_widths is None:
+        column_widths = compute_column_widths(df, width_sample_rows)
+    writer = ExcelChunkWriter(file_path, format_output=format_output, column_widths=column_widths)
+    writer.write(df)
+    writer.close()
+    return writer.rows_written
+
+
+def write_output(df, file_path, format_output=True, width_sample_rows=None, column_widths=None):
+    """
+    Write a DataFrame to the output file, choosing the writer by extension.
+    
+    .xlsx goes through write_excel (formatted in the same pass), .csv and
+    .csv.gz through to_csv, .parquet and .feather through pyarrow.
+    Formatting only applies to Excel output.
+    
+    Parameters:
+    df (pd.DataFrame): Data to write
+    file_path (str): Output path, one of OUTPUT_FORMATS
+    format_output (bool): Apply bold headers and auto column widths (.xlsx only)
+    width_sample_rows (int or None): Size columns from a sample of this many rows
+    column_widths (list or None): Precomputed Excel column widths
+    
+    Returns:
+    int: Number of rows written
+    """
+    extension = output_format(file_path)
+    
+    if extension == '.xlsx':
+        return write_excel(
+            df, file_path,
+            format_output=format_output,
+            width_sample_rows=width_sample_rows,
+            column_widths=column_widths
+        )
+    if extension in ('.csv', '.csv.gz'):
+        df.to_csv(file_path, index=False)
+        return len(df)
+    
+    table = _arrow_table(df)
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, file_path)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, file_path)
+    return len(df)
+
+
+def open_chunk_writer(file_path, format_output=False):
+    """
+    Open an incremental writer for the output file, based on its extension.
+    
+    Parameters:
+    file_path (str): Output path, one of OUTPUT_FORMATS
+    format_output (bool): Format the header and column widths (.xlsx only)
+    
+    Returns:
+    CsvChunkWriter, ExcelChunkWriter or ArrowChunkWriter
+    """
+    extension = output_format(file_path)
+    if extension in ('.csv', '.csv.gz'):
+        return CsvChunkWriter(file_path)
+    if extension == '.xlsx':
+        return ExcelChunkWriter(file_path, format_output=format_output)
+    return ArrowChunkWriter(file_path)